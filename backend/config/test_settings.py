@@ -0,0 +1,42 @@
+"""
+Django settings used by the test suite.
+"""
+from .settings import *  # noqa: F401,F403
+
+# Tests never need the data to outlive the run, so keep the database in RAM.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {
+            'NAME': ':memory:',
+        },
+    }
+}
+
+# No test checks the hash itself; a fast hasher keeps user creation cheap.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+DEBUG = False
+
+# DRF views authenticate with JWTs, so the session, CSRF and security
+# middleware only add overhead to every test request.
+MIDDLEWARE = [
+    'django.middleware.common.CommonMiddleware',
+]
+
+# Nothing under test logs into the admin, so its middleware checks only
+# get in the way of `manage.py check` with these settings.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
+# Anything that still reaches for a session should not hit the database.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': True,
+}
+
+AUTH_PASSWORD_VALIDATORS = []
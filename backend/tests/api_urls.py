@@ -0,0 +1,25 @@
+"""
+API URLs resolved once at import and shared by the test modules.
+"""
+import uuid
+
+from django.urls import reverse
+
+
+def _group_url_template(name):
+    """Resolve a group-scoped URL once and return it as a str.format template."""
+    placeholder = uuid.UUID(int=0)
+    return reverse(name, kwargs={'group_id': placeholder}).replace(str(placeholder), '{group_id}')
+
+
+SIGNUP_URL = reverse('signup')
+LOGIN_URL = reverse('login')
+LOGOUT_URL = reverse('logout')
+PROFILE_URL = reverse('profile')
+CHANGE_PASSWORD_URL = reverse('change-password')
+GROUP_LIST_URL = reverse('group-list')
+
+GROUP_DETAIL_URL = _group_url_template('group-detail')
+GROUP_MEMBERS_URL = _group_url_template('group-members')
+EXPENSE_LIST_URL = _group_url_template('expense-list')
+EXPENSE_BALANCE_URL = _group_url_template('expense-balance')
@@ -1,8 +1,79 @@
 """
 Pytest configuration and fixtures.
 """
+from contextlib import contextmanager
+
 import pytest
-from rest_framework.test import APIClient
+from django.db import transaction
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+
+
+TRANSACTIONAL_FIXTURES = ('transactional_db', 'live_server', 'django_db_reset_sequences')
+
+
+def _is_transactional(item):
+    """Return True if the test would run as a TransactionTestCase."""
+    marker = item.get_closest_marker('django_db')
+    if marker and (marker.kwargs.get('transaction') or marker.kwargs.get('reset_sequences')):
+        return True
+    return any(name in item.fixturenames for name in TRANSACTIONAL_FIXTURES)
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Reject transactional tests that are not explicitly justified.
+
+    TransactionTestCase flushes every table on teardown, which is far slower
+    than a rollback and also discards rows held by the session and module
+    transactions below, so it must be opted into with
+    `@pytest.mark.allow_transactional(reason=...)`.
+    """
+    offenders = [
+        item.nodeid for item in items
+        if _is_transactional(item) and not item.get_closest_marker('allow_transactional')
+    ]
+    if offenders:
+        raise pytest.UsageError(
+            'Transactional tests need @pytest.mark.allow_transactional(reason=...): '
+            + ', '.join(offenders)
+        )
+
+
+@contextmanager
+def _rolled_back_atomic(django_db_blocker):
+    """Hold an atomic block open for the duration and roll it back on exit."""
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+    try:
+        yield
+    finally:
+        with django_db_blocker.unblock():
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def django_db_session_transaction(django_db_setup, django_db_blocker):
+    """
+    Run the whole session inside one outer transaction.
+
+    Each `django_db` test opens its own atomic block, which nests inside this
+    one as a SAVEPOINT and is rolled back to it on teardown. Nothing is ever
+    committed, so higher-scoped fixtures can safely create shared rows.
+    """
+    with _rolled_back_atomic(django_db_blocker):
+        yield
+
+
+@pytest.fixture(scope='module')
+def module_db(django_db_session_transaction, django_db_blocker):
+    """Open a module-wide SAVEPOINT so module-scoped fixtures can write rows."""
+    with _rolled_back_atomic(django_db_blocker):
+        yield
 
 
 @pytest.fixture
@@ -11,16 +82,59 @@ def api_client():
     return APIClient()
 
 
+@pytest.fixture
+def client_for():
+    """Factory fixture returning a fresh API client authenticated as a user."""
+
+    def _client_for(user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+    return _client_for
+
+
+@pytest.fixture(scope='session')
+def request_factory():
+    """
+    Return a request factory for calling views directly.
+
+    Useful for tests that only check side effects, as it skips URL
+    resolution and the middleware stack.
+    """
+    return APIRequestFactory()
+
+
+@pytest.fixture(scope='module')
+def auth_header_for():
+    """Factory fixture returning a Bearer header, signing one token per user."""
+    headers = {}
+
+    def _auth_header_for(user):
+        if user.id not in headers:
+            headers[user.id] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        return headers[user.id]
+    return _auth_header_for
+
+
+def _create_user(email='test@example.com', password='testpass123', username=None):
+    return User.objects.create_user(
+        email=email,
+        password=password,
+        username=username
+    )
+
+
 @pytest.fixture
 def create_user(db):
     """Factory fixture to create users."""
-    from users.models import User
-
-    def _create_user(email='test@example.com', password='testpass123', username=None):
-        return User.objects.create_user(
-            email=email,
-            password=password,
-            username=username
-        )
     return _create_user
 
+
+@pytest.fixture(scope='module')
+def create_module_user(module_db, django_db_blocker):
+    """Factory fixture to create users shared by every test in a module."""
+
+    def _create_module_user(**kwargs):
+        with django_db_blocker.unblock():
+            return _create_user(**kwargs)
+    return _create_module_user
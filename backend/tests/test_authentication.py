@@ -0,0 +1,133 @@
+"""
+Tests for JWT authentication helpers.
+"""
+import pytest
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users import authentication
+from users.authentication import BlacklistJWTAuthentication, CheckedTokenCache
+
+
+class TestCheckedTokenCache:
+    """Tests for the in-process cache of checked token JTIs."""
+
+    def test_add_and_discard(self):
+        """Test a JTI is remembered until discarded."""
+        cache = CheckedTokenCache()
+        cache.add('jti-1')
+
+        assert 'jti-1' in cache
+
+        cache.discard('jti-1')
+
+        assert 'jti-1' not in cache
+
+    def test_entries_expire(self, monkeypatch):
+        """Test a JTI is forgotten once its TTL has passed."""
+        now = [1000.0]
+        monkeypatch.setattr(authentication.time, 'monotonic', lambda: now[0])
+        cache = CheckedTokenCache(ttl=60)
+        cache.add('jti-1')
+
+        now[0] += 61
+
+        assert 'jti-1' not in cache
+
+
+@pytest.mark.django_db(transaction=False)
+class TestBlacklistJWTAuthentication:
+    """Tests for the blacklist-checking JWT authentication."""
+
+    def test_blacklist_checked_once_per_token(self, create_user, request_factory, django_assert_num_queries):
+        """Test the blacklist costs one query on first use and none once cached."""
+        user = create_user(email='authcheck@example.com')
+        token = RefreshToken.for_user(user).access_token
+        request = request_factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        auth = BlacklistJWTAuthentication()
+
+        # One blacklist probe plus the user lookup.
+        with django_assert_num_queries(2):
+            authenticated_user, _ = auth.authenticate(request)
+        with django_assert_num_queries(1):
+            auth.authenticate(request)
+
+        assert authenticated_user == user
+
+    def test_user_loaded_with_used_columns_only(self, create_user, request_factory):
+        """Test the authenticated user skips columns no view reads."""
+        user = create_user(email='narrowauth@example.com')
+        token = RefreshToken.for_user(user).access_token
+        request = request_factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        authenticated_user, _ = BlacklistJWTAuthentication().authenticate(request)
+
+        assert authenticated_user.get_deferred_fields() == {
+            'last_login', 'is_superuser', 'is_staff', 'updated_at'
+        }
+
+    def test_inactive_user_rejected(self, create_user, request_factory):
+        """Test a token for a deactivated user does not authenticate."""
+        user = create_user(email='inactiveauth@example.com')
+        token = RefreshToken.for_user(user).access_token
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        request = request_factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        with pytest.raises(AuthenticationFailed):
+            BlacklistJWTAuthentication().authenticate(request)
+
+    def test_blacklisted_token_rejected(self, create_user, request_factory):
+        """Test a blacklisted access token does not authenticate."""
+        user = create_user(email='revokedauth@example.com')
+        token = RefreshToken.for_user(user).access_token
+        outstanding = OutstandingToken.objects.create(
+            jti=token['jti'], user=user, token=str(token), expires_at=timezone.now()
+        )
+        BlacklistedToken.objects.create(token=outstanding)
+        request = request_factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        with pytest.raises(InvalidToken):
+            BlacklistJWTAuthentication().authenticate(request)
+
+    def test_marked_token_rejected_without_query(self, create_user, request_factory, django_assert_num_queries):
+        """Test a token marked blacklisted is rejected from the cache, even if checked before."""
+        user = create_user(email='markedauth@example.com')
+        token = RefreshToken.for_user(user).access_token
+        request = request_factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        auth = BlacklistJWTAuthentication()
+        auth.authenticate(request)
+
+        authentication.mark_blacklisted(token['jti'], token['exp'])
+
+        with django_assert_num_queries(0), pytest.raises(InvalidToken):
+            auth.authenticate(request)
+
+    def test_checked_token_skips_shared_cache(self, create_user, request_factory, monkeypatch):
+        """Test a token this process checked recently is not looked up in the shared cache."""
+        user = create_user(email='localcheck@example.com')
+        token = RefreshToken.for_user(user).access_token
+        request = request_factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        auth = BlacklistJWTAuthentication()
+        auth.authenticate(request)
+        lookups = []
+        monkeypatch.setattr(authentication, '_blacklist_key', lookups.append)
+
+        auth.authenticate(request)
+
+        assert lookups == []
+
+    def test_token_revoked_by_password_change(self, create_user, request_factory, monkeypatch):
+        """Test CHECK_REVOKE_TOKEN still rejects tokens issued before a password change."""
+        # simplejwt modules hold the settings object they imported, so patch it in place
+        monkeypatch.setattr(authentication.api_settings, 'CHECK_REVOKE_TOKEN', True)
+        user = create_user(email='revokecheck@example.com')
+        token = RefreshToken.for_user(user).access_token
+        request = request_factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user.set_password('changedpass123')
+        user.save(update_fields=['password'])
+
+        with pytest.raises(AuthenticationFailed):
+            BlacklistJWTAuthentication().authenticate(request)
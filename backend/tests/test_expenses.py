@@ -1,57 +1,71 @@
 """
 Tests for expense management functionality.
 """
+import uuid
+from pathlib import Path
+
 import pytest
 from decimal import Decimal
-from django.urls import reverse
+from django.core.management import call_command
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.test import force_authenticate
 
 from users.models import User, Group, Expense
+from users.views import ExpenseListView
+from tests.api_urls import EXPENSE_LIST_URL, EXPENSE_BALANCE_URL
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
 
 
-@pytest.fixture
-def authenticated_client(api_client, create_user):
-    """Return an authenticated API client."""
-    user = create_user(email='auth@example.com', password='testpass123')
-    refresh = RefreshToken.for_user(user)
-    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
-    return api_client
+@pytest.fixture(scope='module')
+def group_with_members(module_db, django_db_blocker):
+    """Load a group with multiple members, shared read-only by the module."""
+    with django_db_blocker.unblock():
+        call_command('loaddata', FIXTURES_DIR / 'group_with_members.json', verbosity=0)
+        group = Group.objects.get(name='Test Group')
+        users = {user.email: user for user in group.members.all()}
+    return (
+        group,
+        users['creator@example.com'],
+        users['member1@example.com'],
+        users['member2@example.com'],
+    )
 
 
-@pytest.fixture
-def group_with_members(create_user):
-    """Create a group with multiple members."""
-    creator = create_user(email='creator@example.com', password='testpass123')
-    member1 = create_user(email='member1@example.com', password='testpass123')
-    member2 = create_user(email='member2@example.com', password='testpass123')
+def assert_balance(balance, paid, owed, net):
+    """Assert a balance summary entry has the expected paid, owed and net amounts."""
+    assert Decimal(balance['total_paid']) == Decimal(paid)
+    assert Decimal(balance['total_owed']) == Decimal(owed)
+    assert Decimal(balance['net_balance']) == Decimal(net)
 
-    group = Group.objects.create(name='Test Group', created_by=creator)
-    group.members.add(creator, member1, member2)
-    return group, creator, member1, member2
 
+@pytest.fixture(scope='module')
+def outsider(create_module_user):
+    """Create a user who is not a member of any group."""
+    return create_module_user(email='outsider@example.com', password='testpass123')
 
-@pytest.mark.django_db
+
+@pytest.mark.django_db(transaction=False)
 class TestExpenseListView:
     """Tests for the expense list/create API endpoint."""
 
-    def test_create_expense_success(self, authenticated_client, group_with_members):
+    def test_create_expense_success(self, request_factory, group_with_members):
         """Test successful expense creation."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
         data = {
             'amount': '100.00',
             'paid_by': str(creator.id),
             'description': 'Dinner expense'
         }
 
-        response = authenticated_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        force_authenticate(request, user=creator)
+        response = ExpenseListView.as_view()(request, group_id=group.id)
 
         assert response.status_code == status.HTTP_201_CREATED
-        assert response.data['amount'] == '100.00'
+        assert Decimal(response.data['amount']) == Decimal('100.00')
         assert response.data['description'] == 'Dinner expense'
         assert response.data['paid_by']['id'] == str(creator.id)
         assert 'id' in response.data
@@ -59,226 +73,313 @@ class TestExpenseListView:
         # Verify expense was created
         assert Expense.objects.filter(group=group, paid_by=creator).exists()
 
-    def test_create_expense_without_description(self, authenticated_client, group_with_members):
+    def test_create_expense_without_description(self, client_for, group_with_members):
         """Test creating expense without description."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
         data = {
             'amount': '50.00',
             'paid_by': str(creator.id)
         }
 
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_201_CREATED
-        assert response.data['amount'] == '50.00'
+        assert Decimal(response.data['amount']) == Decimal('50.00')
         assert response.data['description'] is None
 
-    def test_create_expense_missing_amount(self, authenticated_client, group_with_members):
+    def test_create_expense_query_count(self, client_for, group_with_members, django_assert_num_queries):
+        """Test the payer's membership is probed with a single-row query."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(creator)
+
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
+        data = {'amount': '20.00', 'paid_by': str(member2.id)}
+        # Membership check, group, payer, payer membership and the INSERT.
+        with django_assert_num_queries(5) as captured:
+            response = client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert captured.captured_queries[3]['sql'].startswith('SELECT 1 AS "a" FROM "users"')
+
+    def test_create_expense_missing_amount(self, client_for, group_with_members):
         """Test creating expense without amount returns 400."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
         data = {'paid_by': str(creator.id)}
 
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'errors' in response.data
 
-    def test_create_expense_invalid_amount(self, authenticated_client, group_with_members):
+    def test_create_expense_invalid_amount(self, client_for, group_with_members):
         """Test creating expense with invalid amount returns 400."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
         data = {
             'amount': '0.00',
             'paid_by': str(creator.id)
         }
 
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_create_expense_non_member_payer(self, authenticated_client, group_with_members, create_user):
+    def test_create_expense_non_member_payer(self, client_for, group_with_members, create_user):
         """Test creating expense with non-member payer returns 400."""
         group, creator, member1, member2 = group_with_members
         non_member = create_user(email='nonmember@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
         data = {
             'amount': '100.00',
             'paid_by': str(non_member.id)
         }
 
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'error' in response.data
 
-    def test_create_expense_not_group_member(self, authenticated_client, group_with_members, create_user):
-        """Test creating expense when requester is not a group member returns 403."""
+    def test_create_expenses_in_bulk(self, client_for, group_with_members, django_assert_num_queries):
+        """Test a list payload creates every expense with a fixed number of queries."""
         group, creator, member1, member2 = group_with_members
-        outsider = create_user(email='outsider@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(outsider)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
+        data = [
+            {'amount': '30.00', 'paid_by': str(creator.id), 'description': ' Taxi '},
+            {'amount': '45.50', 'paid_by': str(member1.id)},
+            {'amount': '12.25', 'paid_by': str(member2.id)},
+        ]
+
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
+        # Membership check, group lookup, one payer lookup, and one bulk
+        # INSERT inside its savepoint.
+        with django_assert_num_queries(6):
+            response = client.post(url, data, format='json')
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
-        data = {
-            'amount': '100.00',
-            'paid_by': str(creator.id)
-        }
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [Decimal(expense['amount']) for expense in response.data] == [
+            Decimal('30.00'), Decimal('45.50'), Decimal('12.25')
+        ]
+        assert response.data[0]['description'] == 'Taxi'
+        assert response.data[1]['paid_by']['id'] == str(member1.id)
+        assert Expense.objects.filter(group=group).count() == 3
+
+    def test_create_expenses_in_bulk_non_member_payer(self, client_for, group_with_members, outsider):
+        """Test one non-member payer rejects the whole batch."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(creator)
+        data = [
+            {'amount': '30.00', 'paid_by': str(creator.id)},
+            {'amount': '45.50', 'paid_by': str(outsider.id)},
+        ]
 
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(EXPENSE_LIST_URL.format(group_id=group.id), data, format='json')
 
-        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
+        assert not Expense.objects.filter(group=group).exists()
+
+    def test_create_expenses_in_bulk_unknown_payer(self, client_for, group_with_members):
+        """Test an unknown payer in a batch returns 404."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(creator)
+        data = [{'amount': '30.00', 'paid_by': str(uuid.uuid4())}]
+
+        response = client.post(EXPENSE_LIST_URL.format(group_id=group.id), data, format='json')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_create_expenses_in_bulk_empty(self, client_for, group_with_members):
+        """Test an empty list is rejected."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(creator)
+
+        response = client.post(EXPENSE_LIST_URL.format(group_id=group.id), [], format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'errors' in response.data
 
-    def test_get_expenses(self, authenticated_client, group_with_members):
+    def test_get_expenses(self, client_for, group_with_members):
         """Test getting expense history."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
         # Create some expenses
         Expense.objects.create(group=group, paid_by=creator, amount=Decimal('100.00'), description='Expense 1')
         Expense.objects.create(group=group, paid_by=member1, amount=Decimal('50.00'), description='Expense 2')
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
-        response = authenticated_client.get(url)
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
+        response = client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
-        assert response.data[0]['amount'] == '50.00'  # Most recent first
-        assert response.data[1]['amount'] == '100.00'
+        assert len(response.json()) == 2
+        assert Decimal(response.json()[0]['amount']) == Decimal('50.00')  # Most recent first
+        assert Decimal(response.json()[1]['amount']) == Decimal('100.00')
+
+    def test_get_expenses_query_count(self, client_for, group_with_members, django_assert_num_queries):
+        """Test the expense list costs one query for the group and one for its expenses."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(creator)
+        Expense.objects.create(group=group, paid_by=creator, amount=Decimal('10.00'))
+        Expense.objects.create(group=group, paid_by=member2, amount=Decimal('20.00'))
+
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
+        with django_assert_num_queries(2):
+            response = client.get(url)
 
-    def test_get_expenses_empty(self, authenticated_client, group_with_members):
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
+
+    def test_get_expenses_empty(self, client_for, group_with_members):
         """Test getting expenses when group has none."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
-        response = authenticated_client.get(url)
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
+        response = client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.json()) == 0
 
-    def test_get_expenses_not_group_member(self, authenticated_client, group_with_members, create_user):
-        """Test getting expenses when not a group member returns 403."""
+    def test_get_expenses_amounts_are_strings(self, client_for, group_with_members):
+        """Test expense amounts are sent as decimal strings."""
         group, creator, member1, member2 = group_with_members
-        outsider = create_user(email='outsider2@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(outsider)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
+        Expense.objects.create(group=group, paid_by=creator, amount=Decimal('12.50'))
 
-        url = reverse('expense-list', kwargs={'group_id': group.id})
-        response = authenticated_client.get(url)
+        url = EXPENSE_LIST_URL.format(group_id=group.id)
+        response = client.get(url)
 
-        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.json()[0]['amount'] == '12.50'
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=False)
 class TestExpenseBalanceView:
     """Tests for the expense balance summary API endpoint."""
 
-    def test_get_balance_summary(self, authenticated_client, group_with_members):
+    def test_get_balance_summary(self, client_for, group_with_members):
         """Test getting balance summary."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
         # Create expenses
         # Creator pays $100, Member1 pays $50
         # Total: $150, equal share per person: $50
-        Expense.objects.create(group=group, paid_by=creator, amount=Decimal('100.00'))
-        Expense.objects.create(group=group, paid_by=member1, amount=Decimal('50.00'))
+        Expense.objects.bulk_create([
+            Expense(group=group, paid_by=creator, amount=Decimal('100.00')),
+            Expense(group=group, paid_by=member1, amount=Decimal('50.00')),
+        ])
 
-        url = reverse('expense-balance', kwargs={'group_id': group.id})
-        response = authenticated_client.get(url)
+        url = EXPENSE_BALANCE_URL.format(group_id=group.id)
+        response = client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 3  # 3 members
 
-        # Find creator's balance
-        creator_balance = next(b for b in response.data if b['user']['id'] == str(creator.id))
-        assert creator_balance['total_paid'] == '100.00'
-        assert creator_balance['total_owed'] == '50.00'  # Equal share
-        assert creator_balance['net_balance'] == '50.00'  # Paid 100, owes 50, net +50
-
-        # Find member1's balance
-        member1_balance = next(b for b in response.data if b['user']['id'] == str(member1.id))
-        assert member1_balance['total_paid'] == '50.00'
-        assert member1_balance['total_owed'] == '50.00'  # Equal share
-        assert member1_balance['net_balance'] == '0.00'  # Paid 50, owes 50, net 0
-
-        # Find member2's balance
-        member2_balance = next(b for b in response.data if b['user']['id'] == str(member2.id))
-        assert member2_balance['total_paid'] == '0.00'
-        assert member2_balance['total_owed'] == '50.00'  # Equal share
-        assert member2_balance['net_balance'] == '-50.00'  # Paid 0, owes 50, net -50
-
-    def test_get_balance_summary_empty_group(self, authenticated_client, group_with_members):
+        balances = {b['user']['id']: b for b in response.data}
+        assert_balance(balances[str(creator.id)], '100.00', '50.00', '50.00')  # Paid 100, owes 50, net +50
+        assert_balance(balances[str(member1.id)], '50.00', '50.00', '0.00')  # Paid 50, owes 50, net 0
+        assert_balance(balances[str(member2.id)], '0.00', '50.00', '-50.00')  # Paid 0, owes 50, net -50
+
+    def test_get_balance_summary_amounts_are_strings(self, client_for, group_with_members):
+        """Test balance amounts are sent as decimal strings."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(creator)
+        Expense.objects.create(group=group, paid_by=creator, amount=Decimal('30.00'))
+
+        url = EXPENSE_BALANCE_URL.format(group_id=group.id)
+        response = client.get(url)
+
+        balance = {b['user']['id']: b for b in response.json()}[str(creator.id)]
+        assert balance['total_paid'] == '30.00'
+        assert balance['total_owed'] == '10.00'
+        assert balance['net_balance'] == '20.00'
+
+    def test_get_balance_summary_query_count(self, client_for, group_with_members, django_assert_num_queries):
+        """Test the summary is aggregated in the database, independent of the expense count."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(creator)
+        Expense.objects.bulk_create([
+            Expense(group=group, paid_by=payer, amount=Decimal('10.00'))
+            for payer in [creator, member1, member2, creator, member1]
+        ])
+
+        url = EXPENSE_BALANCE_URL.format(group_id=group.id)
+        with django_assert_num_queries(3):
+            response = client.get(url)
+
+        balances = {b['user']['id']: b for b in response.data}
+        assert_balance(balances[str(creator.id)], '20.00', '16.67', '3.33')
+        assert_balance(balances[str(member2.id)], '10.00', '16.67', '-6.67')
+
+    def test_get_balance_summary_empty_group(self, client_for, group_with_members):
         """Test getting balance summary when group has no expenses."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
-        url = reverse('expense-balance', kwargs={'group_id': group.id})
-        response = authenticated_client.get(url)
+        url = EXPENSE_BALANCE_URL.format(group_id=group.id)
+        response = client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 3  # 3 members
 
         # All balances should be zero
         for balance in response.data:
-            assert balance['total_paid'] == '0.00'
-            assert balance['total_owed'] == '0.00'
-            assert balance['net_balance'] == '0.00'
+            assert_balance(balance, '0.00', '0.00', '0.00')
 
-    def test_get_balance_summary_not_group_member(self, authenticated_client, group_with_members, create_user):
-        """Test getting balance summary when not a group member returns 403."""
-        group, creator, member1, member2 = group_with_members
-        outsider = create_user(email='outsider3@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(outsider)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
-
-        url = reverse('expense-balance', kwargs={'group_id': group.id})
-        response = authenticated_client.get(url)
-
-        assert response.status_code == status.HTTP_403_FORBIDDEN
-
-    def test_get_balance_summary_equal_shares(self, authenticated_client, group_with_members):
+    def test_get_balance_summary_equal_shares(self, client_for, group_with_members):
         """Test balance calculation with equal shares."""
         group, creator, member1, member2 = group_with_members
-        refresh = RefreshToken.for_user(creator)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(creator)
 
         # Create expense: $90 total, 3 members, each owes $30
         Expense.objects.create(group=group, paid_by=creator, amount=Decimal('90.00'))
 
-        url = reverse('expense-balance', kwargs={'group_id': group.id})
-        response = authenticated_client.get(url)
+        url = EXPENSE_BALANCE_URL.format(group_id=group.id)
+        response = client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
 
         # Creator paid $90, owes $30, net +$60
-        creator_balance = next(b for b in response.data if b['user']['id'] == str(creator.id))
-        assert creator_balance['total_paid'] == '90.00'
-        assert creator_balance['total_owed'] == '30.00'
-        assert creator_balance['net_balance'] == '60.00'
+        balances = {b['user']['id']: b for b in response.data}
+        assert_balance(balances[str(creator.id)], '90.00', '30.00', '60.00')
 
         # Other members owe $30 each
         for member in [member1, member2]:
-            member_balance = next(b for b in response.data if b['user']['id'] == str(member.id))
-            assert member_balance['total_paid'] == '0.00'
-            assert member_balance['total_owed'] == '30.00'
-            assert member_balance['net_balance'] == '-30.00'
+            assert_balance(balances[str(member.id)], '0.00', '30.00', '-30.00')
+
+
+@pytest.mark.django_db(transaction=False)
+class TestExpenseMembershipRequired:
+    """Tests that expense endpoints are restricted to group members."""
 
+    @pytest.mark.parametrize('url_template,method', [
+        (EXPENSE_LIST_URL, 'post'),
+        (EXPENSE_LIST_URL, 'get'),
+        (EXPENSE_BALANCE_URL, 'get'),
+    ])
+    def test_not_group_member(self, client_for, group_with_members, outsider, url_template, method):
+        """Test accessing an expense endpoint when not a group member returns 403."""
+        group, creator, member1, member2 = group_with_members
+        client = client_for(outsider)
+
+        url = url_template.format(group_id=group.id)
+        if method == 'post':
+            data = {
+                'amount': '100.00',
+                'paid_by': str(creator.id)
+            }
+            response = client.post(url, data, format='json')
+        else:
+            response = client.get(url)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -1,20 +1,23 @@
 """
 Tests for group management functionality.
 """
+import uuid
+
 import pytest
-from django.urls import reverse
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.test import force_authenticate
 
 from users.models import User, Group
+from users.services import GroupService, GroupNotFoundError, UserAlreadyMemberError
+from users.views import GroupListView, GroupDetailView, GroupMembersView
+from tests.api_urls import GROUP_LIST_URL, GROUP_DETAIL_URL, GROUP_MEMBERS_URL
 
 
 @pytest.fixture
 def authenticated_client(api_client, create_user):
     """Return an authenticated API client."""
     user = create_user(email='auth@example.com', password='testpass123')
-    refresh = RefreshToken.for_user(user)
-    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+    api_client.force_authenticate(user=user)
     return api_client
 
 
@@ -24,25 +27,29 @@ def another_user(create_user):
     return create_user(email='other@example.com', password='testpass123')
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=False)
 class TestGroupListView:
     """Tests for the group list/create API endpoint."""
 
-    def test_create_group_success(self, authenticated_client, create_user):
+    def test_create_group_success(self, request_factory, create_user):
         """Test successful group creation."""
-        url = reverse('group-list')
+        user = create_user(email='creategroup@example.com', password='testpass123')
+        url = GROUP_LIST_URL
         data = {
             'name': 'Test Group',
             'description': 'A test group'
         }
 
-        response = authenticated_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        force_authenticate(request, user=user)
+        response = GroupListView.as_view()(request)
 
         assert response.status_code == status.HTTP_201_CREATED
         assert response.data['name'] == 'Test Group'
         assert response.data['description'] == 'A test group'
         assert 'id' in response.data
-        assert 'created_by' in response.data
+        assert response.data['created_by_id'] == str(user.id)
+        assert 'created_by' not in response.data
         assert response.data['member_count'] == 1  # Creator is automatically added
 
         # Verify group was created
@@ -50,7 +57,7 @@ class TestGroupListView:
 
     def test_create_group_without_description(self, authenticated_client):
         """Test creating group without description."""
-        url = reverse('group-list')
+        url = GROUP_LIST_URL
         data = {'name': 'Simple Group'}
 
         response = authenticated_client.post(url, data, format='json')
@@ -61,7 +68,7 @@ class TestGroupListView:
 
     def test_create_group_missing_name(self, authenticated_client):
         """Test creating group without name returns 400."""
-        url = reverse('group-list')
+        url = GROUP_LIST_URL
         data = {'description': 'No name group'}
 
         response = authenticated_client.post(url, data, format='json')
@@ -71,42 +78,78 @@ class TestGroupListView:
 
     def test_create_group_empty_name(self, authenticated_client):
         """Test creating group with empty name returns 400."""
-        url = reverse('group-list')
+        url = GROUP_LIST_URL
         data = {'name': ''}
 
         response = authenticated_client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_get_user_groups(self, authenticated_client, create_user):
+    def test_get_user_groups(self, client_for, create_user):
         """Test getting user's groups."""
         user = create_user(email='groupuser@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
         # Create a group
-        url = reverse('group-list')
+        url = GROUP_LIST_URL
         data = {'name': 'My Group'}
-        authenticated_client.post(url, data, format='json')
+        client.post(url, data, format='json')
 
         # Get user's groups
-        response = authenticated_client.get(url)
+        response = client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 1
+        assert response.json()[0]['name'] == 'My Group'
+
+    def test_get_user_groups_member_count(self, client_for, create_user, another_user):
+        """Test listed groups count all their members, not just the requester."""
+        user = create_user(email='countuser@example.com', password='testpass123')
+        group = Group.objects.create(name='Counted Group', created_by=user)
+        group.members.add(user, another_user)
+
+        response = client_for(user).get(GROUP_LIST_URL)
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
-        assert response.data[0]['name'] == 'My Group'
+        assert response.json()[0]['member_count'] == 2
+
+    def test_get_user_groups_expand_created_by(self, client_for, create_user):
+        """Test `?expand=created_by` embeds each group's creator."""
+        user = create_user(email='expanduser@example.com', password='testpass123')
+        group = Group.objects.create(name='Expanded Group', created_by=user)
+        group.members.add(user)
+
+        response = client_for(user).get(GROUP_LIST_URL, {'expand': 'created_by'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]['created_by_id'] == str(user.id)
+        assert response.json()[0]['created_by']['email'] == 'expanduser@example.com'
+
+    def test_get_user_groups_query_count(self, client_for, create_user, another_user, django_assert_max_num_queries):
+        """Test listing groups does not query once per group."""
+        user = create_user(email='queryuser@example.com', password='testpass123')
+        for name in ['First Group', 'Second Group', 'Third Group']:
+            group = Group.objects.create(name=name, created_by=another_user)
+            group.members.add(user, another_user)
+        client = client_for(user)
+
+        with django_assert_max_num_queries(1):
+            response = client.get(GROUP_LIST_URL, {'expand': 'created_by'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [group['member_count'] for group in response.json()] == [2, 2, 2]
 
     def test_get_user_groups_empty(self, authenticated_client):
         """Test getting groups when user has none."""
-        url = reverse('group-list')
+        url = GROUP_LIST_URL
         response = authenticated_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.json()) == 0
 
     def test_create_group_unauthorized(self, api_client):
         """Test creating group without authentication returns 401."""
-        url = reverse('group-list')
+        url = GROUP_LIST_URL
         data = {'name': 'Unauthorized Group'}
 
         response = api_client.post(url, data, format='json')
@@ -114,122 +157,166 @@ class TestGroupListView:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=False)
 class TestGroupDetailView:
     """Tests for the group detail API endpoint."""
 
-    def test_get_group_details(self, authenticated_client, create_user):
+    def test_get_group_details(self, client_for, create_user):
         """Test getting group details."""
         user = create_user(email='detailuser@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
         # Create a group
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'Detail Group', 'description': 'Group for details'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Get group details
-        url = reverse('group-detail', kwargs={'group_id': group_id})
-        response = authenticated_client.get(url)
+        url = GROUP_DETAIL_URL.format(group_id=group_id)
+        response = client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data['name'] == 'Detail Group'
         assert response.data['description'] == 'Group for details'
 
+    def test_get_group_by_hex_id(self, authenticated_client):
+        """Test the group ID can also be given without hyphens."""
+        create_response = authenticated_client.post(GROUP_LIST_URL, {'name': 'Hex Group'}, format='json')
+        group_id = create_response.data['id']
+
+        url = GROUP_DETAIL_URL.format(group_id=group_id.replace('-', ''))
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['id'] == group_id
+
+    def test_get_group_details_query_count(self, client_for, create_user, another_user, django_assert_max_num_queries):
+        """Test group details cost one query for the group and membership, and one for the count."""
+        user = create_user(email='detailcount@example.com', password='testpass123')
+        group = Group.objects.create(name='Counted Detail Group', created_by=user)
+        group.members.add(user, another_user)
+        client = client_for(user)
+
+        with django_assert_max_num_queries(2):
+            response = client.get(GROUP_DETAIL_URL.format(group_id=group.id))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['member_count'] == 2
+
     def test_get_group_not_found(self, authenticated_client):
         """Test getting non-existent group returns 404."""
-        import uuid
-        url = reverse('group-detail', kwargs={'group_id': uuid.uuid4()})
+        url = GROUP_DETAIL_URL.format(group_id=uuid.uuid4())
         response = authenticated_client.get(url)
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
-    def test_get_group_not_member(self, authenticated_client, create_user, another_user):
+    def test_get_group_partly_hyphenated_id(self, authenticated_client):
+        """Test a group ID with only some of its hyphens returns 404."""
+        create_response = authenticated_client.post(GROUP_LIST_URL, {'name': 'Mixed Group'}, format='json')
+        group_id = create_response.data['id']
+
+        url = GROUP_DETAIL_URL.format(group_id=group_id.replace('-', '', 1))
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_group_not_member(self, client_for, create_user, another_user):
         """Test getting group when not a member returns 403."""
         # Create group with another user
-        refresh = RefreshToken.for_user(another_user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(another_user)
 
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'Other Group'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Try to access with different user
         user = create_user(email='outsider@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
-        url = reverse('group-detail', kwargs={'group_id': group_id})
-        response = authenticated_client.get(url)
+        url = GROUP_DETAIL_URL.format(group_id=group_id)
+        response = client.get(url)
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
-    def test_delete_group_success(self, authenticated_client, create_user):
+    def test_delete_group_success(self, client_for, request_factory, create_user):
         """Test successful group deletion by creator."""
         user = create_user(email='deleteuser@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
         # Create a group
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'To Delete'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Delete group
-        url = reverse('group-detail', kwargs={'group_id': group_id})
-        response = authenticated_client.delete(url)
+        url = GROUP_DETAIL_URL.format(group_id=group_id)
+        request = request_factory.delete(url)
+        force_authenticate(request, user=user)
+        response = GroupDetailView.as_view()(request, group_id=group_id)
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
         assert not Group.objects.filter(id=group_id).exists()
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=False)
 class TestGroupMembersView:
     """Tests for the group members API endpoint."""
 
-    def test_get_group_members(self, authenticated_client, create_user, another_user):
+    def test_get_group_members(self, client_for, create_user, another_user):
         """Test getting group members."""
         user = create_user(email='memberuser@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
         # Create a group
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'Members Group'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Add a member
-        members_url = reverse('group-members', kwargs={'group_id': group_id})
+        members_url = GROUP_MEMBERS_URL.format(group_id=group_id)
         add_data = {'user_id': str(another_user.id)}
-        authenticated_client.post(members_url, add_data, format='json')
+        client.post(members_url, add_data, format='json')
 
         # Get members
-        response = authenticated_client.get(members_url)
+        response = client.get(members_url)
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 2  # Creator + added member
 
-    def test_add_member_success(self, authenticated_client, create_user, another_user):
+    def test_get_group_members_query_count(self, client_for, create_user, another_user, django_assert_num_queries):
+        """Test listing members costs the membership check plus one query, with no deferred loads."""
+        user = create_user(email='membercount@example.com', password='testpass123')
+        group = Group.objects.create(name='Counted Members Group', created_by=user)
+        group.members.add(user, another_user)
+        client = client_for(user)
+
+        with django_assert_num_queries(2):
+            response = client.get(GROUP_MEMBERS_URL.format(group_id=group.id))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {member['user']['email'] for member in response.data} == {user.email, another_user.email}
+
+    def test_add_member_success(self, client_for, request_factory, create_user, another_user):
         """Test successfully adding a member to group."""
         user = create_user(email='addmember@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
         # Create a group
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'Add Member Group'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Add member
-        url = reverse('group-members', kwargs={'group_id': group_id})
+        url = GROUP_MEMBERS_URL.format(group_id=group_id)
         data = {'user_id': str(another_user.id)}
-        response = authenticated_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        force_authenticate(request, user=user)
+        response = GroupMembersView.as_view()(request, group_id=group_id)
 
         assert response.status_code == status.HTTP_201_CREATED
         assert 'user' in response.data
@@ -239,68 +326,110 @@ class TestGroupMembersView:
         group = Group.objects.get(id=group_id)
         assert another_user in group.members.all()
 
-    def test_add_member_duplicate(self, authenticated_client, create_user, another_user):
+    def test_add_member_duplicate(self, client_for, create_user, another_user):
         """Test adding duplicate member returns 409."""
         user = create_user(email='duplicate@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
         # Create a group
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'Duplicate Group'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Add member first time
-        url = reverse('group-members', kwargs={'group_id': group_id})
+        url = GROUP_MEMBERS_URL.format(group_id=group_id)
         data = {'user_id': str(another_user.id)}
-        authenticated_client.post(url, data, format='json')
+        client.post(url, data, format='json')
 
         # Try to add again
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_409_CONFLICT
         assert 'error' in response.data
 
-    def test_add_member_user_not_found(self, authenticated_client, create_user):
+    def test_add_member_user_not_found(self, client_for, create_user):
         """Test adding non-existent user returns 404."""
         user = create_user(email='notfound@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
         # Create a group
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'Not Found Group'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Try to add non-existent user
-        import uuid
-        url = reverse('group-members', kwargs={'group_id': group_id})
+        url = GROUP_MEMBERS_URL.format(group_id=group_id)
         data = {'user_id': str(uuid.uuid4())}
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
-    def test_add_member_not_group_member(self, authenticated_client, create_user, another_user):
+    def test_add_member_not_group_member(self, client_for, create_user, another_user):
         """Test adding member when requester is not a group member returns 403."""
         # Create group with another user
-        refresh = RefreshToken.for_user(another_user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(another_user)
 
-        create_url = reverse('group-list')
+        create_url = GROUP_LIST_URL
         create_data = {'name': 'Restricted Group'}
-        create_response = authenticated_client.post(create_url, create_data, format='json')
+        create_response = client.post(create_url, create_data, format='json')
         group_id = create_response.data['id']
 
         # Try to add member with different user (not a member)
         user = create_user(email='outsider2@example.com', password='testpass123')
-        refresh = RefreshToken.for_user(user)
-        authenticated_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
-        url = reverse('group-members', kwargs={'group_id': group_id})
+        url = GROUP_MEMBERS_URL.format(group_id=group_id)
         data = {'user_id': str(another_user.id)}
-        response = authenticated_client.post(url, data, format='json')
+        response = client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
+
+
+@pytest.mark.django_db(transaction=False)
+class TestGroupService:
+    """Tests for the group service queries."""
+
+    def test_get_group_members_single_query(self, create_user, another_user, django_assert_num_queries):
+        """Test a group's members are fetched in one query."""
+        user = create_user(email='serviceuser@example.com', password='testpass123')
+        group = Group.objects.create(name='Service Group', created_by=user)
+        group.members.add(user, another_user)
+
+        with django_assert_num_queries(1):
+            members = set(GroupService().get_group_members(group.id))
+
+        assert members == {user, another_user}
+
+    def test_get_group_members_not_found(self):
+        """Test an unknown group raises GroupNotFoundError."""
+        with pytest.raises(GroupNotFoundError):
+            GroupService().get_group_members(uuid.uuid4())
+
+    def test_add_member_relies_on_unique_constraint(self, create_user, another_user, django_assert_num_queries):
+        """Test adding a member does not look up existing memberships first."""
+        user = create_user(email='adder@example.com', password='testpass123')
+        group = Group.objects.create(name='Service Group', created_by=user)
+
+        with django_assert_num_queries(5) as captured:
+            GroupService().add_member(group.id, another_user.id)
+
+        statements = [query['sql'].split()[0] for query in captured.captured_queries]
+        assert statements == ['SELECT', 'SELECT', 'SAVEPOINT', 'INSERT', 'RELEASE']
+        with pytest.raises(UserAlreadyMemberError):
+            GroupService().add_member(group.id, another_user.id)
+
+    def test_get_group_annotates_membership(self, create_user, another_user, django_assert_num_queries):
+        """Test the membership check is folded into the group fetch."""
+        user = create_user(email='fetcher@example.com', password='testpass123')
+        group = Group.objects.create(name='Service Group', created_by=user)
+        group.members.add(user)
+
+        with django_assert_num_queries(2):
+            as_member = GroupService().get_group(group.id, user=user)
+            as_outsider = GroupService().get_group(group.id, user=another_user)
+
+        assert as_member.is_member is True
+        assert as_outsider.is_member is False
@@ -0,0 +1,90 @@
+"""
+Tests for the password hashers.
+"""
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.test import override_settings
+
+from users.hashers import TunedArgon2PasswordHasher, TunedBCryptSHA256PasswordHasher
+from users.models import User
+from users.services import UserService
+
+FAST_ARGON2 = {'ARGON2_TIME_COST': 1, 'ARGON2_MEMORY_COST': 8, 'ARGON2_PARALLELISM': 1}
+
+
+class TestTunedArgon2PasswordHasher:
+    """Tests for the Argon2id hasher with configurable costs."""
+
+    @override_settings(**FAST_ARGON2)
+    def test_uses_configured_costs(self):
+        """Test new hashes use the configured costs and verify."""
+        hasher = TunedArgon2PasswordHasher()
+
+        encoded = hasher.encode('secret123', hasher.salt())
+
+        decoded = hasher.decode(encoded)
+        assert encoded.startswith('argon2$argon2id$')
+        assert (decoded['time_cost'], decoded['memory_cost'], decoded['parallelism']) == (1, 8, 1)
+        assert hasher.verify('secret123', encoded)
+        assert not hasher.must_update(encoded)
+
+    def test_rehashes_when_costs_change(self):
+        """Test hashes made with other costs are flagged for upgrade."""
+        hasher = TunedArgon2PasswordHasher()
+        with override_settings(**FAST_ARGON2):
+            encoded = hasher.encode('secret123', hasher.salt())
+
+        with override_settings(**{**FAST_ARGON2, 'ARGON2_MEMORY_COST': 16}):
+            assert hasher.must_update(encoded)
+
+
+class TestTunedBCryptSHA256PasswordHasher:
+    """Tests for the bcrypt hasher with a configurable work factor."""
+
+    @override_settings(BCRYPT_ROUNDS=4)
+    def test_uses_configured_rounds(self):
+        """Test new hashes use the configured work factor and verify."""
+        hasher = TunedBCryptSHA256PasswordHasher()
+
+        encoded = hasher.encode('secret123', hasher.salt())
+
+        assert hasher.decode(encoded)['work_factor'] == 4
+        assert hasher.verify('secret123', encoded)
+        assert not hasher.must_update(encoded)
+
+    def test_rehashes_when_rounds_change(self):
+        """Test hashes made with another work factor are flagged for upgrade."""
+        hasher = TunedBCryptSHA256PasswordHasher()
+        with override_settings(BCRYPT_ROUNDS=4):
+            encoded = hasher.encode('secret123', hasher.salt())
+
+        with override_settings(BCRYPT_ROUNDS=5):
+            assert hasher.must_update(encoded)
+
+
+@pytest.fixture
+def upgrade_hashers(settings):
+    """Prefer Argon2id while still accepting bcrypt, both at their cheapest costs."""
+    settings.PASSWORD_HASHERS = [
+        'users.hashers.TunedArgon2PasswordHasher',
+        'users.hashers.TunedBCryptSHA256PasswordHasher',
+    ]
+    settings.BCRYPT_ROUNDS = 4
+    for name, value in FAST_ARGON2.items():
+        setattr(settings, name, value)
+
+
+@pytest.mark.django_db(transaction=False)
+class TestPasswordUpgrade:
+    """Tests for moving existing bcrypt hashes to Argon2id."""
+
+    def test_login_rehashes_bcrypt_password(self, upgrade_hashers, create_user):
+        """Test a successful login replaces a bcrypt hash with an Argon2id one."""
+        user = create_user(email='legacy@example.com', password='testpass123')
+        User.objects.filter(pk=user.pk).update(password=make_password('testpass123', hasher='bcrypt_sha256'))
+
+        UserService().login(email='legacy@example.com', password='testpass123')
+
+        user.refresh_from_db()
+        assert user.password.startswith('argon2$argon2id$')
+        assert user.check_password('testpass123')
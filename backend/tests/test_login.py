@@ -2,20 +2,28 @@
 Tests for user login functionality.
 """
 import pytest
-from django.urls import reverse
 from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from users.models import User
+from users.views import LoginView
+from tests.api_urls import LOGIN_URL
 
-@pytest.mark.django_db
+
+@pytest.fixture(scope='module')
+def login_user(create_module_user):
+    """Return a registered user, created once per module."""
+    return create_module_user(email='user@example.com', password='securepassword123')
+
+
+@pytest.mark.django_db(transaction=False, reset_sequences=False)
 class TestLoginEndpoint:
     """Tests for the login API endpoint."""
 
-    def test_login_success(self, api_client, create_user):
+    def test_login_success(self, api_client, login_user):
         """Test successful user login."""
-        # Create a user first
-        create_user(email='user@example.com', password='securepassword123')
-
-        url = reverse('login')
+        url = LOGIN_URL
         data = {
             'email': 'user@example.com',
             'password': 'securepassword123'
@@ -24,17 +32,17 @@ class TestLoginEndpoint:
         response = api_client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_200_OK
-        assert 'access' in response.data
-        assert 'refresh' in response.data
-        assert 'user' in response.data
-        assert response.data['user']['email'] == 'user@example.com'
-        assert 'password' not in response.data['user']
-
-    def test_login_invalid_email(self, api_client, create_user):
+        assert response['Content-Type'] == 'application/json'
+        body = response.json()
+        assert 'access' in body
+        assert 'refresh' in body
+        assert 'user' in body
+        assert body['user']['email'] == 'user@example.com'
+        assert 'password' not in body['user']
+
+    def test_login_invalid_email(self, api_client, login_user):
         """Test login with non-existent email returns 401."""
-        create_user(email='user@example.com', password='securepassword123')
-
-        url = reverse('login')
+        url = LOGIN_URL
         data = {
             'email': 'nonexistent@example.com',
             'password': 'securepassword123'
@@ -45,11 +53,44 @@ class TestLoginEndpoint:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
 
-    def test_login_invalid_password(self, api_client, create_user):
-        """Test login with incorrect password returns 401."""
-        create_user(email='user@example.com', password='securepassword123')
+    def test_login_unknown_email_still_hashes(self, api_client, monkeypatch):
+        """Test an unknown email still pays for a password hash."""
+        hashed = []
+        monkeypatch.setattr(User, 'set_password', lambda user, raw: hashed.append(raw))
+
+        url = LOGIN_URL
+        data = {
+            'email': 'nonexistent@example.com',
+            'password': 'securepassword123'
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert hashed == ['securepassword123']
+
+    def test_login_inactive_user_skips_password_check(self, api_client, create_user, monkeypatch):
+        """Test a disabled account is rejected without checking the password."""
+        user = create_user(email='inactive@example.com', password='securepassword123')
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        checked = []
+        monkeypatch.setattr(User, 'check_password', lambda user, raw: checked.append(raw))
 
-        url = reverse('login')
+        url = LOGIN_URL
+        data = {
+            'email': 'inactive@example.com',
+            'password': 'securepassword123'
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.data['error'] == 'Invalid email or password.'
+        assert checked == []
+
+    def test_login_invalid_password(self, api_client, login_user):
+        """Test login with incorrect password returns 401."""
+        url = LOGIN_URL
         data = {
             'email': 'user@example.com',
             'password': 'wrongpassword'
@@ -60,55 +101,107 @@ class TestLoginEndpoint:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
 
-    def test_login_missing_email(self, api_client):
+    def test_login_missing_email(self, request_factory):
         """Test login without email returns 400."""
-        url = reverse('login')
+        url = LOGIN_URL
         data = {
             'password': 'securepassword123'
         }
 
-        response = api_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        response = LoginView.as_view()(request)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'errors' in response.data
 
-    def test_login_missing_password(self, api_client):
+    def test_login_missing_password(self, request_factory):
         """Test login without password returns 400."""
-        url = reverse('login')
+        url = LOGIN_URL
         data = {
             'email': 'user@example.com'
         }
 
-        response = api_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        response = LoginView.as_view()(request)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'errors' in response.data
 
-    def test_login_invalid_email_format(self, api_client):
+    def test_login_invalid_email_format(self, request_factory):
         """Test login with invalid email format returns 400."""
-        url = reverse('login')
+        url = LOGIN_URL
         data = {
             'email': 'invalid-email',
             'password': 'securepassword123'
         }
 
-        response = api_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        response = LoginView.as_view()(request)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'errors' in response.data
 
     def test_login_case_insensitive_email(self, api_client, create_user):
         """Test login with different case email still works."""
-        create_user(email='User@Example.com', password='securepassword123')
+        create_user(email='Mixed.Case@Example.com', password='securepassword123')
 
-        url = reverse('login')
+        url = LOGIN_URL
         data = {
-            'email': 'user@example.com',
+            'email': 'mixed.case@example.com',
             'password': 'securepassword123'
         }
 
         response = api_client.post(url, data, format='json')
 
         assert response.status_code == status.HTTP_200_OK
-        assert 'access' in response.data
+        assert 'access' in response.json()
+
+    def test_login_uppercase_email(self, api_client, login_user):
+        """Test login with an uppercased email matches the stored address."""
+        url = LOGIN_URL
+        data = {
+            'email': 'USER@EXAMPLE.COM',
+            'password': 'securepassword123'
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['user']['email'] == 'user@example.com'
+
+    def test_login_email_saved_outside_the_manager(self, api_client):
+        """Test a mixed-case email saved directly on the model can still log in."""
+        user = User(email='Direct.Save@Example.com')
+        user.set_password('securepassword123')
+        user.save()
+        data = {'email': 'Direct.Save@Example.com', 'password': 'securepassword123'}
+
+        response = api_client.post(LOGIN_URL, data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert User.objects.get(pk=user.pk).email == 'direct.save@example.com'
+
+    def test_login_records_outstanding_refresh_token(self, api_client, login_user):
+        """Test the issued refresh token is recorded against the user."""
+        data = {'email': 'user@example.com', 'password': 'securepassword123'}
 
+        response = api_client.post(LOGIN_URL, data, format='json')
+
+        jti = RefreshToken(response.json()['refresh'])['jti']
+        outstanding = OutstandingToken.objects.get(jti=jti)
+        assert outstanding.user_id == login_user.id
+        assert outstanding.created_at is not None
+
+    def test_login_loads_user_once(self, api_client, login_user, django_assert_num_queries):
+        """Test login reads the user once and never loads deferred fields."""
+        url = LOGIN_URL
+        data = {
+            'email': 'user@example.com',
+            'password': 'securepassword123'
+        }
+
+        # The user lookup plus recording the outstanding refresh token.
+        with django_assert_num_queries(2):
+            response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,114 @@
+"""
+Tests for user logout functionality.
+"""
+import pytest
+from rest_framework import status
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from tests.api_urls import LOGIN_URL, LOGOUT_URL, PROFILE_URL
+
+
+@pytest.fixture
+def logout_user(create_user):
+    """Create the user that logs out."""
+    return create_user(email='logout@example.com', password='testpass123')
+
+
+@pytest.fixture
+def login_tokens(api_client, logout_user):
+    """Log the user in through the API and return the issued tokens."""
+    data = {'email': 'logout@example.com', 'password': 'testpass123'}
+    return api_client.post(LOGIN_URL, data, format='json').json()
+
+
+@pytest.mark.django_db(transaction=False, reset_sequences=False)
+class TestLogoutView:
+    """Tests for the logout API endpoint."""
+
+    def test_logout_blacklists_tokens(self, api_client, login_tokens):
+        """Test logging out blacklists both the refresh and the access token."""
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_tokens['access']}")
+
+        response = api_client.post(LOGOUT_URL, {'refresh': login_tokens['refresh']}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        refresh_jti = RefreshToken(login_tokens['refresh'], verify=False)['jti']
+        assert BlacklistedToken.objects.filter(token__jti=refresh_jti).exists()
+        assert BlacklistedToken.objects.count() == 2
+        access_token = AccessToken(login_tokens['access'])
+        recorded = OutstandingToken.objects.get(jti=access_token['jti'])
+        assert recorded.expires_at == datetime_from_epoch(access_token['exp'])
+
+    def test_logged_out_access_token_rejected(self, api_client, login_tokens):
+        """Test the access token used to log out no longer authenticates."""
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_tokens['access']}")
+        api_client.post(LOGOUT_URL, {'refresh': login_tokens['refresh']}, format='json')
+
+        response = api_client.get(PROFILE_URL)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_logout_access_token_already_outstanding(self, api_client, logout_user, login_tokens):
+        """Test an access token that is already recorded is blacklisted, not duplicated."""
+        access_jti = AccessToken(login_tokens['access'])['jti']
+        OutstandingToken.objects.create(
+            jti=access_jti,
+            user=logout_user,
+            token=login_tokens['access'],
+            created_at=timezone.now(),
+            expires_at=timezone.now()
+        )
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_tokens['access']}")
+
+        response = api_client.post(LOGOUT_URL, {'refresh': login_tokens['refresh']}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert OutstandingToken.objects.filter(jti=access_jti).count() == 1
+        assert BlacklistedToken.objects.filter(token__jti=access_jti).exists()
+
+    def test_logout_twice(self, client_for, logout_user, login_tokens):
+        """Test a blacklisted refresh token is rejected."""
+        client = client_for(logout_user)
+        data = {'refresh': login_tokens['refresh']}
+        client.post(LOGOUT_URL, data, format='json')
+
+        response = client.post(LOGOUT_URL, data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
+
+    def test_logout_malformed_refresh(self, client_for, logout_user):
+        """Test a refresh token that does not decode returns 400."""
+        client = client_for(logout_user)
+
+        response = client.post(LOGOUT_URL, {'refresh': 'not-a-token'}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'error': 'Invalid refresh token.'}
+
+    def test_logout_without_access_token(self, client_for, logout_user, login_tokens):
+        """Test a request not authenticated by a token only blacklists the refresh token."""
+        client = client_for(logout_user)
+
+        response = client.post(LOGOUT_URL, {'refresh': login_tokens['refresh']}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert BlacklistedToken.objects.count() == 1
+
+    def test_logout_missing_refresh(self, client_for, create_user):
+        """Test logout without a refresh token returns 400."""
+        client = client_for(create_user(email='norefresh@example.com'))
+
+        response = client.post(LOGOUT_URL, {}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'errors' in response.data
+
+    def test_logout_unauthorized(self, api_client):
+        """Test logout without authentication returns 401."""
+        response = api_client.post(LOGOUT_URL, {'refresh': 'token'}, format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -2,47 +2,69 @@
 Tests for user profile management functionality.
 """
 import pytest
-from django.urls import reverse
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from users.models import User
+from users.serializers import UserSerializer
+from tests.api_urls import PROFILE_URL, CHANGE_PASSWORD_URL
+
+
+@pytest.fixture(scope='module')
+def auth_user(create_module_user):
+    """Return the user the authenticated client acts as, created once per module."""
+    return create_module_user(email='auth@example.com', password='testpass123')
+
+
+@pytest.fixture
+def authenticated_client(api_client, auth_user):
+    """Return an API client authenticated without going through JWT."""
+    # The user object is shared across the module, so drop any in-memory
+    # changes a previous test's request made to it.
+    auth_user.refresh_from_db()
+    api_client.force_authenticate(user=auth_user)
+    return api_client
 
 
 @pytest.fixture
-def authenticated_client(api_client, create_user):
-    """Return an authenticated API client."""
-    user = create_user(email='auth@example.com', password='testpass123')
-    refresh = RefreshToken.for_user(user)
-    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+def jwt_client(api_client, auth_user, auth_header_for):
+    """Return an API client that sends a real Bearer token."""
+    api_client.credentials(HTTP_AUTHORIZATION=auth_header_for(auth_user))
     return api_client
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=False, reset_sequences=False)
 class TestProfileView:
     """Tests for the profile API endpoint."""
 
-    def test_get_profile_success(self, authenticated_client):
-        """Test retrieving own profile."""
-        url = reverse('profile')
-        response = authenticated_client.get(url)
+    def test_get_profile_success(self, jwt_client):
+        """Test retrieving own profile with a Bearer token."""
+        url = PROFILE_URL
+        response = jwt_client.get(url)
+        data = response.json()
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data['email'] == 'auth@example.com'
-        assert 'id' in response.data
-        assert 'date_joined' in response.data
-        assert 'password' not in response.data
+        assert data['email'] == 'auth@example.com'
+        assert 'id' in data
+        assert 'date_joined' in data
+        assert 'password' not in data
+
+    def test_get_profile_matches_user_serializer(self, authenticated_client):
+        """Test the profile response has the same shape as UserSerializer."""
+        response = authenticated_client.get(PROFILE_URL)
+
+        user = User.objects.get(email='auth@example.com')
+        assert response.json() == UserSerializer(user).data
 
     def test_get_profile_unauthorized(self, api_client):
         """Test retrieving profile without authentication returns 401."""
-        url = reverse('profile')
+        url = PROFILE_URL
         response = api_client.get(url)
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    def test_update_profile_email(self, authenticated_client, create_user):
+    def test_update_profile_email(self, authenticated_client):
         """Test updating profile email."""
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {'email': 'newemail@example.com'}
 
         response = authenticated_client.put(url, data, format='json')
@@ -53,7 +75,7 @@ class TestProfileView:
 
     def test_update_profile_username(self, authenticated_client):
         """Test updating profile username."""
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {'username': 'newusername'}
 
         response = authenticated_client.put(url, data, format='json')
@@ -63,7 +85,7 @@ class TestProfileView:
 
     def test_update_profile_both_fields(self, authenticated_client):
         """Test updating both email and username."""
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {
             'email': 'updated@example.com',
             'username': 'updateduser'
@@ -79,7 +101,7 @@ class TestProfileView:
         """Test updating profile with existing email returns 409."""
         create_user(email='existing@example.com')
 
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {'email': 'existing@example.com'}
 
         response = authenticated_client.put(url, data, format='json')
@@ -91,7 +113,7 @@ class TestProfileView:
         """Test updating profile with existing username returns 409."""
         create_user(email='other@example.com', username='existinguser')
 
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {'username': 'existinguser'}
 
         response = authenticated_client.put(url, data, format='json')
@@ -99,9 +121,23 @@ class TestProfileView:
         assert response.status_code == status.HTTP_409_CONFLICT
         assert 'error' in response.data
 
+    def test_update_profile_single_query(self, authenticated_client, django_assert_num_queries):
+        """Test a profile update is written with one UPDATE and no lookups."""
+        url = PROFILE_URL
+        data = {'email': 'single@example.com', 'username': 'singlequery'}
+
+        # The UPDATE runs inside its own savepoint.
+        with django_assert_num_queries(3) as captured:
+            response = authenticated_client.put(url, data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        statements = [query['sql'].split()[0] for query in captured.captured_queries]
+        assert statements == ['SAVEPOINT', 'UPDATE', 'RELEASE']
+        assert User.objects.get(username='singlequery').email == 'single@example.com'
+
     def test_update_profile_invalid_email(self, authenticated_client):
         """Test updating profile with invalid email returns 400."""
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {'email': 'invalid-email'}
 
         response = authenticated_client.put(url, data, format='json')
@@ -110,7 +146,7 @@ class TestProfileView:
 
     def test_update_profile_patch_method(self, authenticated_client):
         """Test PATCH method works same as PUT."""
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {'username': 'patcheduser'}
 
         response = authenticated_client.patch(url, data, format='json')
@@ -121,10 +157,10 @@ class TestProfileView:
     def test_update_profile_same_email(self, authenticated_client):
         """Test updating profile with same email should succeed."""
         # Get current user email
-        get_response = authenticated_client.get(reverse('profile'))
-        current_email = get_response.data['email']
+        get_response = authenticated_client.get(PROFILE_URL)
+        current_email = get_response.json()['email']
 
-        url = reverse('profile')
+        url = PROFILE_URL
         data = {'email': current_email}
 
         response = authenticated_client.put(url, data, format='json')
@@ -133,18 +169,16 @@ class TestProfileView:
         assert response.data['email'] == current_email
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=False, reset_sequences=False)
 class TestPasswordChangeView:
     """Tests for the password change API endpoint."""
 
-    def test_change_password_success(self, authenticated_client, create_user):
+    def test_change_password_success(self, client_for, create_user):
         """Test successful password change."""
         user = create_user(email='changepass@example.com', password='oldpass123')
-        refresh = RefreshToken.for_user(user)
-        client = authenticated_client
-        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
-        url = reverse('change-password')
+        url = CHANGE_PASSWORD_URL
         data = {
             'old_password': 'oldpass123',
             'new_password': 'newpass123'
@@ -159,14 +193,12 @@ class TestPasswordChangeView:
         user.refresh_from_db()
         assert user.check_password('newpass123')
 
-    def test_change_password_wrong_old_password(self, authenticated_client, create_user):
+    def test_change_password_wrong_old_password(self, client_for, create_user):
         """Test changing password with wrong old password returns 401."""
         user = create_user(email='wrongpass@example.com', password='correctpass123')
-        refresh = RefreshToken.for_user(user)
-        client = authenticated_client
-        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
-        url = reverse('change-password')
+        url = CHANGE_PASSWORD_URL
         data = {
             'old_password': 'wrongpass',
             'new_password': 'newpass123'
@@ -177,14 +209,12 @@ class TestPasswordChangeView:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
 
-    def test_change_password_weak_new_password(self, authenticated_client, create_user):
+    def test_change_password_weak_new_password(self, client_for, create_user):
         """Test changing password with weak new password returns 400."""
         user = create_user(email='weakpass@example.com', password='oldpass123')
-        refresh = RefreshToken.for_user(user)
-        client = authenticated_client
-        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        client = client_for(user)
 
-        url = reverse('change-password')
+        url = CHANGE_PASSWORD_URL
         data = {
             'old_password': 'oldpass123',
             'new_password': 'short'
@@ -197,7 +227,7 @@ class TestPasswordChangeView:
 
     def test_change_password_missing_fields(self, authenticated_client):
         """Test changing password with missing fields returns 400."""
-        url = reverse('change-password')
+        url = CHANGE_PASSWORD_URL
         data = {'old_password': 'oldpass123'}
 
         response = authenticated_client.post(url, data, format='json')
@@ -207,7 +237,7 @@ class TestPasswordChangeView:
 
     def test_change_password_unauthorized(self, api_client):
         """Test changing password without authentication returns 401."""
-        url = reverse('change-password')
+        url = CHANGE_PASSWORD_URL
         data = {
             'old_password': 'oldpass123',
             'new_password': 'newpass123'
@@ -0,0 +1,45 @@
+"""
+Tests for the API response renderers.
+"""
+import json
+import uuid
+from decimal import Decimal
+
+from users.renderers import ORJSONRenderer, json_response
+
+
+class TestORJSONRenderer:
+    """Tests for the orjson-backed JSON renderer."""
+
+    def test_render_matches_json(self):
+        """Test rendering produces JSON for the types serializers return."""
+        user_id = uuid.uuid4()
+        data = {'id': user_id, 'amount': Decimal('10.50'), 'members': [1, 2]}
+
+        content = ORJSONRenderer().render(data)
+
+        assert json.loads(content) == {'id': str(user_id), 'amount': 10.5, 'members': [1, 2]}
+
+    def test_render_none(self):
+        """Test rendering no data returns an empty body."""
+        assert ORJSONRenderer().render(None) == b''
+
+
+class TestJSONResponse:
+    """Tests for the direct JSON response helper."""
+
+    def test_json_response(self):
+        """Test the payload is encoded as a JSON response with the given status."""
+        response = json_response({'email': 'a"b@example.com', 'username': None}, status=201)
+
+        assert response.status_code == 201
+        assert response['Content-Type'] == 'application/json'
+        assert json.loads(response.content) == {'email': 'a"b@example.com', 'username': None}
+
+    def test_json_response_falls_back_like_renderer(self):
+        """Test types orjson does not know are encoded as ORJSONRenderer encodes them."""
+        data = {'amount': Decimal('10.50')}
+
+        response = json_response(data)
+
+        assert response.content == ORJSONRenderer().render(data)
@@ -0,0 +1,118 @@
+"""
+Tests for serializer helpers.
+"""
+from decimal import Decimal
+
+import pytest
+from rest_framework import serializers
+
+from users.models import Expense, Group, GroupMembership
+from users.serializers import (
+    BalanceSummarySerializer,
+    ExpenseSerializer,
+    GroupExpandedSerializer,
+    GroupMemberSerializer,
+    GroupSerializer,
+    LoginSerializer,
+    UserSerializer,
+)
+
+
+class TestCachedFieldsMixin:
+    """Tests for per-class field caching."""
+
+    def test_instances_get_their_own_bound_fields(self):
+        """Test each serializer instance binds its own copy of the fields."""
+        first = LoginSerializer(data={'email': 'bad'})
+        second = LoginSerializer(data={'email': 'user@example.com', 'password': 'secret123'})
+
+        assert first.fields['email'] is not second.fields['email']
+        assert first.fields['email'].parent is first
+        assert second.fields['email'].parent is second
+        assert not first.is_valid()
+        assert second.is_valid()
+
+    def test_model_fields_built_once_per_class(self, monkeypatch):
+        """Test a ModelSerializer only introspects its model the first time."""
+        calls = []
+        build_fields = serializers.ModelSerializer.get_fields
+
+        def counting_get_fields(serializer):
+            calls.append(type(serializer))
+            return build_fields(serializer)
+        monkeypatch.setattr(serializers.ModelSerializer, 'get_fields', counting_get_fields)
+
+        class FreshGroupSerializer(GroupSerializer):
+            pass
+
+        first = FreshGroupSerializer().fields
+        second = FreshGroupSerializer().fields
+
+        assert calls == [FreshGroupSerializer]
+        assert list(first) == list(second)
+        assert first['name'] is not second['name']
+
+    def test_subclass_fields_cached_separately(self):
+        """Test a subclass does not reuse its parent's cached fields."""
+        GroupSerializer().fields
+        expanded = GroupExpandedSerializer().fields
+
+        assert 'created_by' in expanded
+        assert 'created_by' not in GroupSerializer().fields
+
+
+class TestLoginSerializer:
+    """Tests for login request validation."""
+
+    def test_rejects_malformed_email(self):
+        """Test values that are not shaped like an email address are rejected."""
+        for email in ['invalid-email', 'user@example', 'user @example.com']:
+            serializer = LoginSerializer(data={'email': email, 'password': 'secret123'})
+
+            assert not serializer.is_valid()
+            assert 'email' in serializer.errors
+
+
+@pytest.mark.django_db(transaction=False)
+class TestDirectRepresentation:
+    """Tests for response serializers that read attributes directly."""
+
+    @staticmethod
+    def assert_matches_fields(serializer):
+        """Assert the output equals the generic field-by-field representation."""
+        expected = serializers.ModelSerializer.to_representation(serializer, serializer.instance)
+        assert serializer.data == expected
+
+    def test_balance_summary_serializer(self, create_user):
+        """Test BalanceSummarySerializer matches its declared fields, rounding shares."""
+        entry = {
+            'user': create_user(email='balance@example.com'),
+            'total_paid': Decimal('100.00'),
+            'total_owed': Decimal('100.00') / Decimal('3'),
+            'net_balance': Decimal('100.00') - Decimal('100.00') / Decimal('3'),
+        }
+        serializer = BalanceSummarySerializer(entry)
+
+        assert serializer.data == serializers.Serializer.to_representation(serializer, entry)
+
+    def test_user_serializer(self, create_user):
+        """Test UserSerializer matches its declared fields."""
+        user = create_user(email='direct@example.com', username='direct')
+
+        self.assert_matches_fields(UserSerializer(user))
+
+    def test_group_member_serializer(self, create_user):
+        """Test GroupMemberSerializer matches its declared fields."""
+        user = create_user(email='member@example.com')
+        group = Group.objects.create(name='Direct Group', created_by=user)
+        membership = GroupMembership.objects.create(group=group, user=user)
+
+        self.assert_matches_fields(GroupMemberSerializer(membership))
+
+    def test_expense_serializer(self, create_user):
+        """Test ExpenseSerializer matches its declared fields."""
+        user = create_user(email='payer@example.com')
+        group = Group.objects.create(name='Direct Group', created_by=user)
+        expense = Expense.objects.create(group=group, paid_by=user, amount=Decimal('12.50'))
+
+        self.assert_matches_fields(ExpenseSerializer(expense))
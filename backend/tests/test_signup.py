@@ -2,19 +2,20 @@
 Tests for user sign up functionality.
 """
 import pytest
-from django.urls import reverse
 from rest_framework import status
 
 from users.models import User
+from users.views import SignUpView
+from tests.api_urls import SIGNUP_URL
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=False, reset_sequences=False)
 class TestSignUpEndpoint:
     """Tests for the signup API endpoint."""
 
     def test_signup_success(self, api_client):
         """Test successful user registration."""
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'email': 'newuser@example.com',
             'password': 'securepassword123',
@@ -35,7 +36,7 @@ class TestSignUpEndpoint:
 
     def test_signup_without_username(self, api_client):
         """Test registration without optional username."""
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'email': 'noname@example.com',
             'password': 'securepassword123'
@@ -47,11 +48,25 @@ class TestSignUpEndpoint:
         assert response.data['email'] == 'noname@example.com'
         assert response.data['username'] is None
 
+    def test_signup_lowercases_email(self, api_client):
+        """Test the email is stored lowercased."""
+        url = SIGNUP_URL
+        data = {
+            'email': 'Mixed.Case@Example.COM',
+            'password': 'securepassword123'
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['email'] == 'mixed.case@example.com'
+        assert User.objects.filter(email='mixed.case@example.com').exists()
+
     def test_signup_duplicate_email(self, api_client, create_user):
         """Test registration with an existing email returns 409."""
         create_user(email='existing@example.com')
 
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'email': 'existing@example.com',
             'password': 'securepassword123'
@@ -62,11 +77,26 @@ class TestSignUpEndpoint:
         assert response.status_code == status.HTTP_409_CONFLICT
         assert 'error' in response.data
 
+    def test_signup_duplicate_email_different_case(self, api_client, create_user):
+        """Test registration with an existing email in another case returns 409."""
+        create_user(email='existing@example.com')
+
+        url = SIGNUP_URL
+        data = {
+            'email': 'Existing@Example.com',
+            'password': 'securepassword123'
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert User.objects.filter(email='existing@example.com').count() == 1
+
     def test_signup_duplicate_username(self, api_client, create_user):
         """Test registration with an existing username returns 409."""
         create_user(email='user1@example.com', username='existinguser')
 
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'email': 'newuser@example.com',
             'password': 'securepassword123',
@@ -78,49 +108,69 @@ class TestSignUpEndpoint:
         assert response.status_code == status.HTTP_409_CONFLICT
         assert 'error' in response.data
 
-    def test_signup_invalid_email(self, api_client):
+    def test_signup_duplicate_username_different_case(self, api_client, create_user):
+        """Test registration with an existing username in another case returns 409."""
+        create_user(email='user1@example.com', username='existinguser')
+
+        url = SIGNUP_URL
+        data = {
+            'email': 'newuser@example.com',
+            'password': 'securepassword123',
+            'username': 'ExistingUser'
+        }
+
+        response = api_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not User.objects.filter(email='newuser@example.com').exists()
+
+    def test_signup_invalid_email(self, request_factory):
         """Test registration with invalid email returns 400."""
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'email': 'invalid-email',
             'password': 'securepassword123'
         }
 
-        response = api_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        response = SignUpView.as_view()(request)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_signup_weak_password(self, api_client):
+    def test_signup_weak_password(self, request_factory):
         """Test registration with password too short returns 400."""
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'email': 'test@example.com',
             'password': 'short'
         }
 
-        response = api_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        response = SignUpView.as_view()(request)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_signup_missing_email(self, api_client):
+    def test_signup_missing_email(self, request_factory):
         """Test registration without email returns 400."""
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'password': 'securepassword123'
         }
 
-        response = api_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        response = SignUpView.as_view()(request)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_signup_missing_password(self, api_client):
+    def test_signup_missing_password(self, request_factory):
         """Test registration without password returns 400."""
-        url = reverse('signup')
+        url = SIGNUP_URL
         data = {
             'email': 'test@example.com'
         }
 
-        response = api_client.post(url, data, format='json')
+        request = request_factory.post(url, data, format='json')
+        response = SignUpView.as_view()(request)
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
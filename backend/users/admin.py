@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models import Count
 
 from .models import User, Group, GroupMembership, Expense
 
@@ -37,10 +38,15 @@ class GroupAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     readonly_fields = ('id', 'created_at', 'updated_at')
 
+    def get_queryset(self, request):
+        """Annotate member counts so the changelist doesn't count per row."""
+        return super().get_queryset(request).annotate(member_count=Count('members'))
+
     def member_count(self, obj):
         """Display member count."""
-        return obj.members.count()
+        return obj.member_count
     member_count.short_description = 'Members'
+    member_count.admin_order_field = 'member_count'
 
 
 @admin.register(GroupMembership)
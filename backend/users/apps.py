@@ -5,3 +5,9 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
 
+    def ready(self):
+        from django.core.validators import validate_email
+
+        # EmailValidator compiles its regexes on first use; do it while the
+        # worker boots rather than during its first signup.
+        validate_email('warmup@example.com')
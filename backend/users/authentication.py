@@ -1,8 +1,77 @@
 """
 Custom JWT Authentication that checks blacklist.
 """
+import time
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class CheckedTokenCache:
+    """
+    In-process record of token JTIs recently found not to be blacklisted.
+
+    Entries expire after `ttl` seconds, so a token blacklisted by another
+    process is rejected here within that window at the latest.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._expires_at = {}
+
+    def __contains__(self, jti):
+        expires_at = self._expires_at.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            self._expires_at.pop(jti, None)
+            return False
+        return True
+
+    def add(self, jti):
+        """Remember a JTI that is not blacklisted."""
+        if len(self._expires_at) >= self.maxsize:
+            self._expires_at.clear()
+        self._expires_at[jti] = time.monotonic() + self.ttl
+
+    def discard(self, jti):
+        """Forget a JTI, e.g. because it has just been blacklisted."""
+        self._expires_at.pop(jti, None)
+
+
+checked_tokens = CheckedTokenCache()
+
+
+def _blacklist_key(jti):
+    return f'jwt-blacklist:{jti}'
+
+
+def mark_blacklisted(jti, exp=None):
+    """
+    Record a just-blacklisted JTI in the shared cache until it expires.
+
+    With a cache shared between processes, such as Redis, other workers
+    reject the token without a database query once their own
+    `checked_tokens` entry for it, if any, has expired.
+    """
+    checked_tokens.discard(jti)
+    if exp is None:
+        timeout = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    else:
+        timeout = exp - int(time.time())
+    if timeout > 0:
+        cache.set(_blacklist_key(jti), True, timeout)
+
+
+# The columns authenticated views read from `request.user`, plus the ones
+# the password change and the active check need.
+_REQUEST_USER_FIELDS = ('id', 'email', 'username', 'password', 'is_active', 'date_joined')
 
 
 class BlacklistJWTAuthentication(JWTAuthentication):
@@ -19,18 +88,46 @@ class BlacklistJWTAuthentication(JWTAuthentication):
 
         validated_token = self.get_validated_token(raw_token)
         
-        # Check if token is blacklisted
+        # Check if token is blacklisted, asking the shared cache and then
+        # the database only if this process has not checked it recently
         jti = validated_token.get('jti')
-        if jti:
-            try:
-                outstanding_token = OutstandingToken.objects.filter(jti=jti).first()
-                if outstanding_token:
-                    blacklisted = BlacklistedToken.objects.filter(token=outstanding_token).exists()
-                    if blacklisted:
-                        from rest_framework_simplejwt.exceptions import TokenError
-                        raise TokenError('Token is blacklisted')
-            except Exception:
-                pass
-        
+        if jti and jti not in checked_tokens:
+            if cache.get(_blacklist_key(jti)):
+                raise InvalidToken(_('Token is blacklisted'))
+            if BlacklistedToken.objects.filter(token__jti=jti).exists():
+                mark_blacklisted(jti, validated_token.get('exp'))
+                raise InvalidToken(_('Token is blacklisted'))
+            checked_tokens.add(jti)
+
         return self.get_user(validated_token), validated_token
 
+    def get_user(self, validated_token):
+        """
+        Load the token's user with only the columns the views use.
+
+        Mirrors `JWTAuthentication.get_user` apart from the narrowed query.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            user = self.user_model.objects.only(*_REQUEST_USER_FIELDS).get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
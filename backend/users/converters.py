@@ -0,0 +1,21 @@
+"""
+URL path converters.
+"""
+import uuid
+
+
+class FastUUIDConverter:
+    """
+    Match a UUID in hyphenated or bare 32-digit hex form.
+
+    Builds the UUID straight from its bytes, skipping the string
+    normalisation `uuid.UUID(str)` does on every request.
+    """
+
+    regex = '[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
+    def to_python(self, value):
+        return uuid.UUID(bytes=bytes.fromhex(value.replace('-', '')))
+
+    def to_url(self, value):
+        return str(value)
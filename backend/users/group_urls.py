@@ -1,8 +1,9 @@
 """
 URL configuration for group-related endpoints.
 """
-from django.urls import path
+from django.urls import path, register_converter
 
+from .converters import FastUUIDConverter
 from .views import (
     GroupListView,
     GroupDetailView,
@@ -11,11 +12,13 @@ from .views import (
     ExpenseBalanceView,
 )
 
+register_converter(FastUUIDConverter, 'fuuid')
+
 urlpatterns = [
     path('', GroupListView.as_view(), name='group-list'),
-    path('<uuid:group_id>/', GroupDetailView.as_view(), name='group-detail'),
-    path('<uuid:group_id>/members/', GroupMembersView.as_view(), name='group-members'),
-    path('<uuid:group_id>/expenses/', ExpenseListView.as_view(), name='expense-list'),
-    path('<uuid:group_id>/expenses/balance/', ExpenseBalanceView.as_view(), name='expense-balance'),
+    path('<fuuid:group_id>/', GroupDetailView.as_view(), name='group-detail'),
+    path('<fuuid:group_id>/members/', GroupMembersView.as_view(), name='group-members'),
+    path('<fuuid:group_id>/expenses/', ExpenseListView.as_view(), name='expense-list'),
+    path('<fuuid:group_id>/expenses/balance/', ExpenseBalanceView.as_view(), name='expense-balance'),
 ]
 
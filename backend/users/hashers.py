@@ -0,0 +1,44 @@
+"""
+Password hashers.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, BCryptSHA256PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with its costs taken from `settings.ARGON2_TIME_COST`,
+    `settings.ARGON2_MEMORY_COST` (in KiB) and `settings.ARGON2_PARALLELISM`.
+
+    Unlike bcrypt, the time and memory costs can be tuned separately, so
+    the memory cost can carry the brute-force resistance while the time
+    cost keeps `check_password` within the login latency budget. Hashes
+    made with other parameters are rehashed on the user's next successful
+    login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class TunedBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """
+    BCryptSHA256 with its work factor taken from `settings.BCRYPT_ROUNDS`.
+
+    Calibrate the rounds on the production hardware so one `check_password`
+    fits the login latency budget. Hashes made with a different work factor
+    are rehashed on the user's next successful login.
+    """
+
+    @property
+    def rounds(self):
+        return settings.BCRYPT_ROUNDS
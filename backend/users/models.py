@@ -7,11 +7,17 @@ from decimal import Decimal
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class UserManager(BaseUserManager):
     """Custom manager for the User model."""
 
+    @classmethod
+    def normalize_email(cls, email):
+        """Lowercase the whole address so lookups can match it exactly."""
+        return (email or '').strip().lower()
+
     def create_user(self, email, password=None, **extra_fields):
         """Create and return a regular user with an email and password."""
         if not email:
@@ -54,10 +60,22 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         db_table = 'users'
         ordering = ['-date_joined']
+        constraints = [
+            # Emails are stored lowercased; usernames keep their case but
+            # must still be unique regardless of it.
+            models.UniqueConstraint(Lower('username'), name='user_username_ci_uniq'),
+        ]
 
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        # Login looks emails up lowercased, so the admin and direct saves
+        # must store them the same way as create_user does.
+        if 'email' not in self.get_deferred_fields():
+            self.email = self.__class__.objects.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
 
 class Group(models.Model):
     """Group model for expense sharing."""
@@ -0,0 +1,47 @@
+"""
+DRF renderers for API responses.
+"""
+import orjson
+from django.http import HttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Renderer which serializes to JSON using orjson."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    # Fall back to DRF's encoder for types orjson does not know about,
+    # such as Decimal and lazy translation strings.
+    default = staticmethod(encoders.JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON, returning a bytestring."""
+        if data is None:
+            return b''
+
+        options = self.options
+        if renderer_context and renderer_context.get('indent'):
+            # The browsable API asks for indented output.
+            options |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=self.default, option=options)
+
+
+def json_response(data, status=200):
+    """
+    Return `data` as a JSON `HttpResponse`, skipping DRF's `Response`.
+
+    For hot endpoints whose payload is already built, where content
+    negotiation and the renderer pipeline are pure overhead. Encodes the
+    same way as `ORJSONRenderer`.
+    """
+    return HttpResponse(
+        orjson.dumps(data, default=ORJSONRenderer.default, option=ORJSONRenderer.options),
+        content_type=ORJSONRenderer.media_type,
+        status=status
+    )
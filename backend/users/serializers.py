@@ -1,12 +1,39 @@
 """
 DRF Serializers for user-related operations.
 """
+import copy
+import re
+
+from django.utils import timezone
 from rest_framework import serializers
 
 from .models import User, Group, GroupMembership, Expense
 
+# Loose shape check for login emails; a malformed address can never match
+# a stored one, so the full EmailValidator is only needed at sign up.
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+class CachedFieldsMixin:
+    """
+    Build a serializer's fields once per class and reuse them.
+
+    DRF deep-copies every declared field on each instantiation. Binding a
+    field to its serializer only assigns attributes, so a shallow copy of a
+    pristine per-class prototype is enough.
+    """
+
+    _field_prototypes = {}
+
+    def get_fields(self):
+        cls = type(self)
+        prototypes = self._field_prototypes.get(cls)
+        if prototypes is None:
+            prototypes = self._field_prototypes[cls] = super().get_fields()
+        return {name: copy.copy(field) for name, field in prototypes.items()}
+
 
-class SignUpSerializer(serializers.Serializer):
+class SignUpSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for user sign up requests."""
 
     email = serializers.EmailField(required=True)
@@ -23,17 +50,27 @@ class SignUpSerializer(serializers.Serializer):
         max_length=150
     )
 
+    def validate_email(self, value):
+        """Store and compare emails in lowercase."""
+        return User.objects.normalize_email(value)
 
-class LoginSerializer(serializers.Serializer):
+
+class LoginSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for user login requests."""
 
-    email = serializers.EmailField(required=True)
+    email = serializers.CharField(required=True)
     password = serializers.CharField(
         required=True,
         write_only=True,
         style={'input_type': 'password'}
     )
 
+    def validate_email(self, value):
+        """Reject values that are not shaped like an email address."""
+        if not _EMAIL_RE.match(value):
+            raise serializers.ValidationError('Enter a valid email address.')
+        return User.objects.normalize_email(value)
+
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user responses."""
@@ -41,10 +78,40 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'username', 'date_joined']
-        read_only_fields = ['id', 'date_joined']
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        return user_to_dict(instance)
+
+
+def datetime_to_str(value):
+    """Format a datetime the same way DRF's DateTimeField does."""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
 
+def user_to_dict(user):
+    """
+    Build the `UserSerializer` representation of a user without DRF fields.
 
-class ProfileUpdateSerializer(serializers.Serializer):
+    Used on hot response paths where a serializer instance per user is
+    pure overhead, and by the response serializers below, whose
+    `to_representation` reads attributes directly instead of walking their
+    bound fields.
+    """
+    return {
+        'id': str(user.id),
+        'email': user.email,
+        'username': user.username,
+        'date_joined': datetime_to_str(user.date_joined),
+    }
+
+
+class ProfileUpdateSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for updating user profile."""
 
     email = serializers.EmailField(required=False)
@@ -55,8 +122,12 @@ class ProfileUpdateSerializer(serializers.Serializer):
         max_length=150
     )
 
+    def validate_email(self, value):
+        """Store and compare emails in lowercase."""
+        return User.objects.normalize_email(value)
 
-class PasswordChangeSerializer(serializers.Serializer):
+
+class PasswordChangeSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for changing user password."""
 
     old_password = serializers.CharField(
@@ -72,36 +143,56 @@ class PasswordChangeSerializer(serializers.Serializer):
     )
 
 
-class LogoutSerializer(serializers.Serializer):
+class LogoutSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for logout requests."""
 
     refresh = serializers.CharField(required=True)
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for group responses."""
 
-    created_by = UserSerializer(read_only=True)
+    created_by_id = serializers.UUIDField(read_only=True)
     member_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Group
-        fields = ['id', 'name', 'description', 'created_by', 'member_count', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'created_by_id', 'member_count', 'created_at', 'updated_at']
+        read_only_fields = fields
 
     def get_member_count(self, obj):
         """Get the number of members in the group."""
-        return obj.members.count()
+        member_count = getattr(obj, 'member_count', None)
+        if member_count is None:
+            member_count = obj.members.count()
+        return member_count
+
+
+class GroupExpandedSerializer(GroupSerializer):
+    """Serializer for group responses that also embed the creator."""
+
+    created_by = serializers.SerializerMethodField()
+
+    class Meta(GroupSerializer.Meta):
+        fields = [
+            'id', 'name', 'description', 'created_by_id', 'created_by',
+            'member_count', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
 
+    def get_created_by(self, obj):
+        """Get the creator's user representation."""
+        return user_to_dict(obj.created_by)
 
-class GroupCreateSerializer(serializers.Serializer):
+
+class GroupCreateSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for creating groups."""
 
     name = serializers.CharField(required=True, max_length=255)
     description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
 
 
-class AddMemberSerializer(serializers.Serializer):
+class AddMemberSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for adding members to groups."""
 
     user_id = serializers.UUIDField(required=True)
@@ -115,7 +206,17 @@ class GroupMemberSerializer(serializers.ModelSerializer):
     class Meta:
         model = GroupMembership
         fields = ['user', 'joined_at']
-        read_only_fields = ['user', 'joined_at']
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        return {
+            'user': user_to_dict(instance.user),
+            'joined_at': datetime_to_str(instance.joined_at),
+        }
+
+
+# Only used to format amounts, so they honour COERCE_DECIMAL_TO_STRING.
+_amount_field = serializers.DecimalField(max_digits=10, decimal_places=2)
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
@@ -126,10 +227,21 @@ class ExpenseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Expense
         fields = ['id', 'group', 'paid_by', 'amount', 'description', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        return {
+            'id': str(instance.id),
+            'group': instance.group_id,
+            'paid_by': user_to_dict(instance.paid_by),
+            'amount': _amount_field.to_representation(instance.amount),
+            'description': instance.description,
+            'created_at': datetime_to_str(instance.created_at),
+            'updated_at': datetime_to_str(instance.updated_at),
+        }
 
 
-class ExpenseCreateSerializer(serializers.Serializer):
+class ExpenseCreateSerializer(CachedFieldsMixin, serializers.Serializer):
     """Serializer for creating expenses."""
 
     amount = serializers.DecimalField(
@@ -150,3 +262,11 @@ class BalanceSummarySerializer(serializers.Serializer):
     total_owed = serializers.DecimalField(max_digits=10, decimal_places=2)
     net_balance = serializers.DecimalField(max_digits=10, decimal_places=2)
 
+    def to_representation(self, instance):
+        return {
+            'user': user_to_dict(instance['user']),
+            'total_paid': _amount_field.to_representation(instance['total_paid']),
+            'total_owed': _amount_field.to_representation(instance['total_owed']),
+            'net_balance': _amount_field.to_representation(instance['net_balance']),
+        }
+
@@ -4,7 +4,8 @@ Business logic layer for user-related operations.
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -73,30 +74,36 @@ class UserService:
         # Validate password strength
         self._validate_password(password)
 
-        # Check for existing email
-        if self._email_exists(email):
-            raise EmailAlreadyExistsError('A user with this email already exists.')
-
-        # Check for existing username if provided
-        if username and self._username_exists(username):
-            raise UsernameAlreadyExistsError('A user with this username already exists.')
-
-        # Create user
+        # The unique indexes on email and lower(username) are the duplicate
+        # checks. Create the user in a savepoint so a duplicate leaves any
+        # outer transaction usable.
         try:
-            user = User.objects.create_user(
-                email=email,
-                password=password,
-                username=username
-            )
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    email=email,
+                    password=password,
+                    username=username
+                )
             return user
         except IntegrityError as e:
-            # Handle race condition where user was created between check and create
-            if 'email' in str(e).lower():
-                raise EmailAlreadyExistsError('A user with this email already exists.')
-            if 'username' in str(e).lower():
-                raise UsernameAlreadyExistsError('A user with this username already exists.')
+            self._raise_if_duplicate(e)
             raise
 
+    def _raise_if_duplicate(self, error: IntegrityError) -> None:
+        """Raise the matching service error if `error` is a duplicate email or username."""
+        constraint = self._violated_constraint(error)
+        if 'email' in constraint:
+            raise EmailAlreadyExistsError('A user with this email already exists.')
+        if 'username' in constraint:
+            raise UsernameAlreadyExistsError('A user with this username already exists.')
+
+    def _violated_constraint(self, error: IntegrityError) -> str:
+        """Return the name of the constraint behind an IntegrityError, lowercased."""
+        # psycopg reports the constraint name; other backends only the message
+        diag = getattr(error.__cause__, 'diag', None)
+        constraint_name = getattr(diag, 'constraint_name', None)
+        return (constraint_name or str(error)).lower()
+
     def _validate_email(self, email: str) -> None:
         """Validate email format."""
         try:
@@ -111,20 +118,13 @@ class UserService:
                 f'Password must be at least {self.MIN_PASSWORD_LENGTH} characters long.'
             )
 
-    def _email_exists(self, email: str) -> bool:
-        """Check if email is already registered."""
-        return User.objects.filter(email__iexact=email).exists()
-
-    def _username_exists(self, username: str) -> bool:
-        """Check if username is already taken."""
-        return User.objects.filter(username__iexact=username).exists()
-
     def login(self, email: str, password: str) -> User:
         """
         Authenticate a user with email and password.
 
         Args:
-            email: User's email address
+            email: User's email address, already normalized with
+                `User.objects.normalize_email`
             password: User's password
 
         Returns:
@@ -133,22 +133,26 @@ class UserService:
         Raises:
             InvalidCredentialsError: If email or password is incorrect
         """
-        # Normalize email (case-insensitive lookup)
-        normalized_email = User.objects.normalize_email(email)
-        
-        # Try to get user by email (case-insensitive)
+        # Only load what authentication and the login response read
         try:
-            user = User.objects.get(email__iexact=normalized_email)
+            user = User.objects.only(
+                'id', 'email', 'username', 'password', 'is_active', 'date_joined'
+            ).get(email=email)
         except User.DoesNotExist:
+            # Hash the password anyway so an unknown email takes as long to
+            # reject as a wrong password, like Django's ModelBackend
+            User().set_password(password)
+            raise InvalidCredentialsError('Invalid email or password.')
+
+        # Reject disabled accounts before paying for the password hash. The
+        # message matches a bad password so it does not confirm the account.
+        if not user.is_active:
             raise InvalidCredentialsError('Invalid email or password.')
 
         # Check password
         if not user.check_password(password):
             raise InvalidCredentialsError('Invalid email or password.')
 
-        if not user.is_active:
-            raise InvalidCredentialsError('User account is disabled.')
-
         return user
 
     def update_profile(self, user: User, email: str = None, username: str = None) -> User:
@@ -157,7 +161,8 @@ class UserService:
 
         Args:
             user: The User instance to update
-            email: New email address (optional)
+            email: New email address, already normalized with
+                `User.objects.normalize_email` (optional)
             username: New username (optional)
 
         Returns:
@@ -168,24 +173,26 @@ class UserService:
             EmailAlreadyExistsError: If email is already registered by another user
             UsernameAlreadyExistsError: If username is already taken by another user
         """
-        # Validate email if provided
+        changes = {}
         if email is not None:
             self._validate_email(email)
-            # Check if email is already taken by another user
-            if self._email_exists(email) and user.email.lower() != email.lower():
-                raise EmailAlreadyExistsError('A user with this email already exists.')
-            user.email = email
-
-        # Check username if provided
+            changes['email'] = email
         if username is not None:
-            # Check if username is already taken by another user
-            if username and self._username_exists(username):
-                existing_user = User.objects.filter(username__iexact=username).first()
-                if existing_user and existing_user.id != user.id:
-                    raise UsernameAlreadyExistsError('A user with this username already exists.')
-            user.username = username
-
-        user.save()
+            changes['username'] = username
+        # update() skips auto_now, so bump it here as save() would
+        changes['updated_at'] = timezone.now()
+
+        # A single UPDATE; the unique indexes reject emails and usernames
+        # that belong to another user
+        try:
+            with transaction.atomic():
+                User.objects.filter(pk=user.pk).update(**changes)
+        except IntegrityError as e:
+            self._raise_if_duplicate(e)
+            raise
+
+        for field, value in changes.items():
+            setattr(user, field, value)
         return user
 
     def change_password(self, user: User, old_password: str, new_password: str) -> None:
@@ -210,7 +217,7 @@ class UserService:
 
         # Set new password
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=['password', 'updated_at'])
 
 
 class GroupServiceError(UserServiceError):
@@ -283,21 +290,23 @@ class GroupService:
         """
         from .models import Group, GroupMembership
 
-        try:
-            group = Group.objects.get(id=group_id)
-        except Group.DoesNotExist:
+        if not Group.objects.filter(id=group_id).exists():
             raise GroupNotFoundError('Group not found.')
 
+        # The user row is needed anyway for the membership response
         try:
-            user = User.objects.get(id=user_id)
+            user = User.objects.only('id', 'email', 'username', 'date_joined').get(id=user_id)
         except User.DoesNotExist:
             raise UserNotFoundError('User not found.')
 
-        # Check if user is already a member
-        if GroupMembership.objects.filter(group=group, user=user).exists():
+        # The unique (group, user) constraint is the membership check; the
+        # savepoint keeps a duplicate from breaking any outer transaction.
+        # Foreign keys are deferred, so they are checked above instead.
+        try:
+            with transaction.atomic():
+                membership = GroupMembership.objects.create(group_id=group_id, user=user)
+        except IntegrityError:
             raise UserAlreadyMemberError('User is already a member of this group.')
-
-        membership = GroupMembership.objects.create(group=group, user=user)
         return membership
 
     def get_user_groups(self, user: User):
@@ -308,11 +317,19 @@ class GroupService:
             user: User instance
 
         Returns:
-            QuerySet of Group instances
+            QuerySet of Group instances, annotated with member_count
         """
-        from .models import Group
+        from django.db.models import Count
 
-        return Group.objects.filter(members=user).distinct()
+        from .models import Group, GroupMembership
+
+        # Filtering through a subquery keeps the members join free for the
+        # count and returns each group once without a DISTINCT.
+        return (
+            Group.objects
+            .filter(id__in=GroupMembership.objects.filter(user=user).values('group_id'))
+            .annotate(member_count=Count('members'))
+        )
 
     def get_group_members(self, group_id: str):
         """
@@ -329,30 +346,42 @@ class GroupService:
         """
         from .models import Group
 
-        try:
-            group = Group.objects.get(id=group_id)
-        except Group.DoesNotExist:
+        members = User.objects.filter(groupmembership__group_id=group_id)
+        # A group always has at least its creator, so only an empty result
+        # needs the extra query to tell a missing group apart
+        if not members and not Group.objects.filter(id=group_id).exists():
             raise GroupNotFoundError('Group not found.')
 
-        return group.members.all()
+        return members
 
-    def get_group(self, group_id: str):
+    def get_group(self, group_id: str, user: User = None, fields=None):
         """
         Get a group by ID.
 
         Args:
             group_id: UUID of the group
+            user: User whose membership to check (optional)
+            fields: Names of the only columns to load (optional)
 
         Returns:
-            Group instance
+            Group instance; when `user` is given, annotated with `is_member`
 
         Raises:
             GroupNotFoundError: If group doesn't exist
         """
-        from .models import Group
+        from django.db.models import Exists, OuterRef
 
+        from .models import Group, GroupMembership
+
+        groups = Group.objects.all()
+        if fields is not None:
+            groups = groups.only(*fields)
+        if user is not None:
+            # Fold the membership check into the group fetch
+            memberships = GroupMembership.objects.filter(group=OuterRef('pk'), user=user)
+            groups = groups.annotate(is_member=Exists(memberships))
         try:
-            return Group.objects.get(id=group_id)
+            return groups.get(id=group_id)
         except Group.DoesNotExist:
             raise GroupNotFoundError('Group not found.')
 
@@ -432,7 +461,7 @@ class ExpenseService:
             raise UserNotFoundError('User not found.')
 
         # Validate payer is a group member
-        if paid_by not in group.members.all():
+        if not group.members.filter(pk=paid_by.pk).exists():
             raise InvalidPayerError('Payer must be a member of the group.')
 
         # Validate amount
@@ -447,6 +476,63 @@ class ExpenseService:
         )
         return expense
 
+    def bulk_create_expenses(self, group_id: str, expenses):
+        """
+        Create several expenses for a group at once.
+
+        Either every expense is created or none is.
+
+        Args:
+            group_id: UUID of the group
+            expenses: List of dicts with `amount`, `paid_by` (user UUID)
+                and an optional `description`
+
+        Returns:
+            List of the created Expense instances, in input order
+
+        Raises:
+            GroupNotFoundError: If group doesn't exist
+            UserNotFoundError: If a payer doesn't exist
+            InvalidPayerError: If a payer is not a group member
+            ValueError: If an amount is invalid
+        """
+        from .models import Expense, Group
+        from decimal import Decimal
+
+        if not Group.objects.filter(id=group_id).exists():
+            raise GroupNotFoundError('Group not found.')
+
+        # Load every payer that is a member in one query; only the ids left
+        # over need a second look to tell unknown users from outsiders
+        payer_ids = {expense['paid_by'] for expense in expenses}
+        payers = {
+            user.pk: user
+            for user in User.objects.only('id', 'email', 'username', 'date_joined').filter(
+                pk__in=payer_ids, groupmembership__group_id=group_id
+            )
+        }
+        missing_ids = payer_ids - payers.keys()
+        if missing_ids:
+            if User.objects.filter(pk__in=missing_ids).count() < len(missing_ids):
+                raise UserNotFoundError('User not found.')
+            raise InvalidPayerError('Payer must be a member of the group.')
+
+        if any(expense['amount'] <= 0 for expense in expenses):
+            raise ValueError('Amount must be greater than zero.')
+
+        created = []
+        for expense in expenses:
+            description = expense.get('description')
+            created.append(Expense(
+                group_id=group_id,
+                paid_by=payers[expense['paid_by']],
+                amount=Decimal(str(expense['amount'])),
+                description=description.strip() if description else None
+            ))
+
+        with transaction.atomic():
+            return Expense.objects.bulk_create(created)
+
     def get_group_expenses(self, group_id: str):
         """
         Get all expenses for a group.
@@ -462,12 +548,21 @@ class ExpenseService:
         """
         from .models import Expense, Group
 
-        try:
-            group = Group.objects.get(id=group_id)
-        except Group.DoesNotExist:
+        expenses = (
+            Expense.objects.filter(group_id=group_id)
+            .select_related('paid_by')
+            .only(
+                'id', 'group', 'amount', 'description', 'created_at', 'updated_at',
+                'paid_by__id', 'paid_by__email', 'paid_by__username', 'paid_by__date_joined'
+            )
+            .order_by('-created_at')
+        )
+        # Only an empty result needs the extra query to tell a group with
+        # no expenses apart from a missing one
+        if not expenses and not Group.objects.filter(id=group_id).exists():
             raise GroupNotFoundError('Group not found.')
 
-        return Expense.objects.filter(group=group).select_related('paid_by').order_by('-created_at')
+        return expenses
 
     def calculate_balance_summary(self, group_id: str):
         """
@@ -489,58 +584,41 @@ class ExpenseService:
         Raises:
             GroupNotFoundError: If group doesn't exist
         """
+        from django.db.models import DecimalField, Q, Sum, Value
+        from django.db.models.functions import Coalesce
+
         from .models import Expense, Group
         from decimal import Decimal
-        from collections import defaultdict
 
-        try:
-            group = Group.objects.get(id=group_id)
-        except Group.DoesNotExist:
-            raise GroupNotFoundError('Group not found.')
-
-        # Get all group members
-        members = group.members.all()
-        member_count = members.count()
+        # Sum what each member paid in the database, so only one row per
+        # member comes back however many expenses the group has
+        members = list(
+            User.objects.only('id', 'email', 'username', 'date_joined')
+            .filter(groupmembership__group_id=group_id)
+            .annotate(total_paid=Coalesce(
+                Sum('expenses_paid__amount', filter=Q(expenses_paid__group_id=group_id)),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            ))
+        )
 
-        if member_count == 0:
+        if not members:
+            if not Group.objects.filter(id=group_id).exists():
+                raise GroupNotFoundError('Group not found.')
             return []
 
-        # Initialize balances for all members
-        balances = defaultdict(lambda: {
-            'user': None,
-            'total_paid': Decimal('0.00'),
-            'total_owed': Decimal('0.00'),
-            'net_balance': Decimal('0.00')
-        })
-
-        # Initialize user references
-        for member in members:
-            balances[member.id]['user'] = member
-
-        # Get all expenses for the group
-        expenses = Expense.objects.filter(group=group)
-
-        # Calculate equal share per expense
-        for expense in expenses:
-            equal_share = expense.amount / Decimal(str(member_count))
-
-            # Add to paid_by's total_paid
-            balances[expense.paid_by.id]['total_paid'] += expense.amount
-
-            # Add equal_share to all members' total_owed
-            for member in members:
-                balances[member.id]['total_owed'] += equal_share
-
-        # Calculate net_balance for each member
-        summary = []
-        for member_id, balance_data in balances.items():
-            balance_data['net_balance'] = balance_data['total_paid'] - balance_data['total_owed']
-            summary.append({
-                'user': balance_data['user'],
-                'total_paid': balance_data['total_paid'],
-                'total_owed': balance_data['total_owed'],
-                'net_balance': balance_data['net_balance']
-            })
-
-        return summary
+        # Every expense is split equally, so each member owes the same
+        # share of the group's total
+        total = Expense.objects.filter(group_id=group_id).aggregate(total=Sum('amount'))['total']
+        total_owed = (total or Decimal('0.00')) / Decimal(len(members))
+
+        return [
+            {
+                'user': member,
+                'total_paid': member.total_paid,
+                'total_owed': total_owed,
+                'net_balance': member.total_paid - total_owed
+            }
+            for member in members
+        ]
 
@@ -1,27 +1,35 @@
 """
 API views for user-related operations.
 """
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.state import token_backend
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 
+from .authentication import mark_blacklisted
+from .models import GroupMembership
+from .renderers import json_response
 from .serializers import (
     SignUpSerializer,
     LoginSerializer,
-    UserSerializer,
     ProfileUpdateSerializer,
     PasswordChangeSerializer,
     LogoutSerializer,
     GroupSerializer,
+    GroupExpandedSerializer,
     GroupCreateSerializer,
     AddMemberSerializer,
     GroupMemberSerializer,
     ExpenseSerializer,
     ExpenseCreateSerializer,
     BalanceSummarySerializer,
+    user_to_dict,
 )
 from .services import (
     UserService,
@@ -41,15 +49,39 @@ from .services import (
 )
 
 
+# The services hold no state, so every view shares one instance of each
+# instead of building new ones for each request.
+_USER_SERVICE = UserService()
+_GROUP_SERVICE = GroupService()
+_EXPENSE_SERVICE = ExpenseService()
+
+# Views that fetch a group only to check membership need nothing but its key
+_MEMBERSHIP_CHECK_FIELDS = ('id',)
+
+
+def _is_member(group, user):
+    """Return True if `user` belongs to `group`, without loading its members."""
+    is_member = getattr(group, 'is_member', None)
+    if is_member is None:
+        is_member = group.members.filter(pk=user.pk).exists()
+    return is_member
+
+
+def _validation_error(serializer):
+    """Return the 400 response for a serializer that failed validation."""
+    return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _expands_created_by(request):
+    """Return True if the request asked for `?expand=created_by`."""
+    return 'created_by' in request.query_params.get('expand', '').split(',')
+
+
 class SignUpView(APIView):
     """API view for user registration."""
 
     permission_classes = [AllowAny]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.user_service = UserService()
-
     def post(self, request):
         """
         Register a new user.
@@ -67,21 +99,17 @@ class SignUpView(APIView):
         serializer = SignUpSerializer(data=request.data)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
-            user = self.user_service.signup(
+            user = _USER_SERVICE.signup(
                 email=serializer.validated_data['email'],
                 password=serializer.validated_data['password'],
                 username=serializer.validated_data.get('username')
             )
 
-            response_serializer = UserSerializer(user)
             return Response(
-                response_serializer.data,
+                user_to_dict(user),
                 status=status.HTTP_201_CREATED
             )
 
@@ -103,10 +131,6 @@ class LoginView(APIView):
 
     permission_classes = [AllowAny]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.user_service = UserService()
-
     def post(self, request):
         """
         Authenticate a user and return JWT tokens.
@@ -123,27 +147,27 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
-            user = self.user_service.login(
+            user = _USER_SERVICE.login(
                 email=serializer.validated_data['email'],
                 password=serializer.validated_data['password']
             )
 
             # Generate JWT tokens
             refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
-            refresh_token = str(refresh)
+            # Sign with the shared backend; str() on each token would first
+            # resolve the backend through import_string per instance
+            access_token = token_backend.encode(refresh.access_token.payload)
+            refresh_token = token_backend.encode(refresh.payload)
 
-            return Response(
+            # The success payload is plain strings, so render it directly
+            return json_response(
                 {
                     'access': access_token,
                     'refresh': refresh_token,
-                    'user': UserSerializer(user).data
+                    'user': user_to_dict(user)
                 },
                 status=status.HTTP_200_OK
             )
@@ -160,10 +184,6 @@ class ProfileView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.user_service = UserService()
-
     def get(self, request):
         """
         Retrieve current user's profile.
@@ -171,8 +191,7 @@ class ProfileView(APIView):
         Returns:
             200: User profile data
         """
-        serializer = UserSerializer(request.user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return json_response(user_to_dict(request.user), status=status.HTTP_200_OK)
 
     def put(self, request):
         """
@@ -187,24 +206,28 @@ class ProfileView(APIView):
             400: Validation error
             409: Email or username already exists
         """
-        serializer = ProfileUpdateSerializer(data=request.data)
+        return self._update(request, partial=False)
+
+    def patch(self, request):
+        """Partial update - same as PUT, as every field is optional."""
+        return self._update(request, partial=True)
+
+    def _update(self, request, partial):
+        """Validate the request body and apply it to the current user."""
+        serializer = ProfileUpdateSerializer(data=request.data, partial=partial)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
-            user = self.user_service.update_profile(
+            user = _USER_SERVICE.update_profile(
                 user=request.user,
                 email=serializer.validated_data.get('email'),
                 username=serializer.validated_data.get('username')
             )
 
-            response_serializer = UserSerializer(user)
             return Response(
-                response_serializer.data,
+                user_to_dict(user),
                 status=status.HTTP_200_OK
             )
 
@@ -220,20 +243,12 @@ class ProfileView(APIView):
                 status=status.HTTP_409_CONFLICT
             )
 
-    def patch(self, request):
-        """Partial update - same as PUT."""
-        return self.put(request)
-
 
 class PasswordChangeView(APIView):
     """API view for changing user password."""
 
     permission_classes = [IsAuthenticated]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.user_service = UserService()
-
     def post(self, request):
         """
         Change user password.
@@ -250,13 +265,10 @@ class PasswordChangeView(APIView):
         serializer = PasswordChangeSerializer(data=request.data)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
-            self.user_service.change_password(
+            _USER_SERVICE.change_password(
                 user=request.user,
                 old_password=serializer.validated_data['old_password'],
                 new_password=serializer.validated_data['new_password']
@@ -299,80 +311,75 @@ class LogoutView(APIView):
         serializer = LogoutSerializer(data=request.data)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
             # Blacklist refresh token (this also blacklists the associated access token)
             refresh_token = RefreshToken(serializer.validated_data['refresh'])
             refresh_token.blacklist()
-            
-            # Also blacklist the current access token if provided
-            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-            if auth_header.startswith('Bearer '):
-                access_token_str = auth_header.split(' ')[1]
-                try:
-                    # Decode access token to get jti
-                    from rest_framework_simplejwt.tokens import UntypedToken
-                    from rest_framework_simplejwt.exceptions import TokenError
-                    from django.utils import timezone
-                    from datetime import timedelta
-                    
-                    untyped_token = UntypedToken(access_token_str)
-                    jti = untyped_token.get('jti')
-                    exp = untyped_token.get('exp')
-                    
-                    if jti:
-                        # Create or get OutstandingToken for access token and blacklist it
-                        outstanding_token, created = OutstandingToken.objects.get_or_create(
-                            jti=jti,
-                            defaults={
-                                'user': request.user,
-                                'token': access_token_str,
-                                'created_at': timezone.now(),
-                                'expires_at': timezone.now() + timedelta(seconds=exp - int(timezone.now().timestamp())) if exp else None,
-                            }
-                        )
-                        BlacklistedToken.objects.get_or_create(token=outstanding_token)
-                except (TokenError, KeyError, Exception):
-                    # Token might not have jti or is invalid, continue anyway
-                    pass
-                except Exception:
-                    # If access token blacklisting fails, continue anyway
-                    pass
-            
-            return Response(
-                {'message': 'Successfully logged out.'},
-                status=status.HTTP_200_OK
-            )
-        except Exception as e:
+        except TokenError:
             return Response(
                 {'error': 'Invalid refresh token.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Also blacklist the access token, which authentication has
+        # already decoded and verified
+        access_token = request.auth
+        if access_token is not None:
+            jti = access_token['jti']
+            exp = access_token['exp']
+            now = timezone.now()
+            expires_at = datetime_from_epoch(exp)
+            # Upsert on the unique jti so the row's id comes back
+            # whether or not the token was already recorded, then
+            # skip the blacklist row if it already exists
+            outstanding_token, = OutstandingToken.objects.bulk_create(
+                [OutstandingToken(
+                    jti=jti,
+                    user=request.user,
+                    token=str(access_token),
+                    created_at=now,
+                    expires_at=expires_at
+                )],
+                update_conflicts=True,
+                unique_fields=['jti'],
+                update_fields=['token']
+            )
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token=outstanding_token)],
+                ignore_conflicts=True
+            )
+            mark_blacklisted(jti, exp)
+
+        return Response(
+            {'message': 'Successfully logged out.'},
+            status=status.HTTP_200_OK
+        )
+
 
 class GroupListView(APIView):
     """API view for listing and creating groups."""
 
     permission_classes = [IsAuthenticated]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.group_service = GroupService()
-
     def get(self, request):
         """
         Get all groups for the current user.
 
+        Query parameters:
+            - expand (optional): `created_by` to embed each group's creator
+
         Returns:
             200: List of user's groups
         """
-        groups = self.group_service.get_user_groups(request.user)
-        serializer = GroupSerializer(groups, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        groups = _GROUP_SERVICE.get_user_groups(request.user)
+        if _expands_created_by(request):
+            groups = groups.select_related('created_by')
+            serializer = GroupExpandedSerializer(groups, many=True)
+        else:
+            serializer = GroupSerializer(groups, many=True)
+        return json_response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request):
         """
@@ -389,13 +396,10 @@ class GroupListView(APIView):
         serializer = GroupCreateSerializer(data=request.data)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
-            group = self.group_service.create_group(
+            group = _GROUP_SERVICE.create_group(
                 name=serializer.validated_data['name'],
                 created_by=request.user,
                 description=serializer.validated_data.get('description')
@@ -418,28 +422,29 @@ class GroupDetailView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.group_service = GroupService()
-
     def get(self, request, group_id):
         """
         Get group details.
 
+        Query parameters:
+            - expand (optional): `created_by` to embed the group's creator
+
         Returns:
             200: Group details
             404: Group not found
         """
         try:
-            group = self.group_service.get_group(group_id)
-            # Check if user is a member
-            if request.user not in group.members.all():
+            group = _GROUP_SERVICE.get_group(group_id, user=request.user)
+            if not _is_member(group, request.user):
                 return Response(
                     {'error': 'You are not a member of this group.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            serializer = GroupSerializer(group)
+            if _expands_created_by(request):
+                serializer = GroupExpandedSerializer(group)
+            else:
+                serializer = GroupSerializer(group)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except GroupNotFoundError as e:
             return Response(
@@ -457,7 +462,7 @@ class GroupDetailView(APIView):
             403: Permission denied
         """
         try:
-            self.group_service.delete_group(group_id, request.user)
+            _GROUP_SERVICE.delete_group(group_id, request.user)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except GroupNotFoundError as e:
             return Response(
@@ -476,10 +481,6 @@ class GroupMembersView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.group_service = GroupService()
-
     def get(self, request, group_id):
         """
         Get all members of a group.
@@ -490,18 +491,21 @@ class GroupMembersView(APIView):
             403: User is not a member
         """
         try:
-            group = self.group_service.get_group(group_id)
-            # Check if user is a member
-            if request.user not in group.members.all():
+            group = _GROUP_SERVICE.get_group(
+                group_id, user=request.user, fields=_MEMBERSHIP_CHECK_FIELDS
+            )
+            if not _is_member(group, request.user):
                 return Response(
                     {'error': 'You are not a member of this group.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            members = self.group_service.get_group_members(group_id)
             # Use GroupMembership to get joined_at
-            from .models import GroupMembership
-            memberships = GroupMembership.objects.filter(group=group).select_related('user')
+            memberships = (
+                GroupMembership.objects.filter(group=group)
+                .select_related('user')
+                .only('joined_at', 'user__id', 'user__email', 'user__username', 'user__date_joined')
+            )
             serializer = GroupMemberSerializer(memberships, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except GroupNotFoundError as e:
@@ -527,21 +531,20 @@ class GroupMembersView(APIView):
         serializer = AddMemberSerializer(data=request.data)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
             # Check if requester is a member of the group
-            group = self.group_service.get_group(group_id)
-            if request.user not in group.members.all():
+            group = _GROUP_SERVICE.get_group(
+                group_id, user=request.user, fields=_MEMBERSHIP_CHECK_FIELDS
+            )
+            if not _is_member(group, request.user):
                 return Response(
                     {'error': 'You must be a member of the group to add members.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            membership = self.group_service.add_member(
+            membership = _GROUP_SERVICE.add_member(
                 group_id=group_id,
                 user_id=str(serializer.validated_data['user_id'])
             )
@@ -573,11 +576,6 @@ class ExpenseListView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.expense_service = ExpenseService()
-        self.group_service = GroupService()
-
     def get(self, request, group_id):
         """
         Get all expenses for a group.
@@ -589,16 +587,18 @@ class ExpenseListView(APIView):
         """
         try:
             # Check if user is a member of the group
-            group = self.group_service.get_group(group_id)
-            if request.user not in group.members.all():
+            group = _GROUP_SERVICE.get_group(
+                group_id, user=request.user, fields=_MEMBERSHIP_CHECK_FIELDS
+            )
+            if not _is_member(group, request.user):
                 return Response(
                     {'error': 'You must be a member of the group to view expenses.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            expenses = self.expense_service.get_group_expenses(group_id)
+            expenses = _EXPENSE_SERVICE.get_group_expenses(group_id)
             serializer = ExpenseSerializer(expenses, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return json_response(serializer.data, status=status.HTTP_200_OK)
         except GroupNotFoundError as e:
             return Response(
                 {'error': str(e)},
@@ -614,37 +614,49 @@ class ExpenseListView(APIView):
             - paid_by (required): UUID of user who paid
             - description (optional): Expense description
 
+            A list of such objects creates all of them at once, or none
+            if any is invalid.
+
         Returns:
-            201: Expense created successfully
+            201: Expense(s) created successfully
             400: Validation error
             404: Group or user not found
             403: User is not a member or payer is not a member
         """
-        serializer = ExpenseCreateSerializer(data=request.data)
+        many = isinstance(request.data, list)
+        if many:
+            serializer = ExpenseCreateSerializer(data=request.data, many=True, allow_empty=False)
+        else:
+            serializer = ExpenseCreateSerializer(data=request.data)
 
         if not serializer.is_valid():
-            return Response(
-                {'errors': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return _validation_error(serializer)
 
         try:
             # Check if user is a member of the group
-            group = self.group_service.get_group(group_id)
-            if request.user not in group.members.all():
+            group = _GROUP_SERVICE.get_group(
+                group_id, user=request.user, fields=_MEMBERSHIP_CHECK_FIELDS
+            )
+            if not _is_member(group, request.user):
                 return Response(
                     {'error': 'You must be a member of the group to add expenses.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            expense = self.expense_service.create_expense(
-                group_id=group_id,
-                amount=serializer.validated_data['amount'],
-                paid_by_id=str(serializer.validated_data['paid_by']),
-                description=serializer.validated_data.get('description')
-            )
+            if many:
+                result = _EXPENSE_SERVICE.bulk_create_expenses(
+                    group_id=group_id,
+                    expenses=serializer.validated_data
+                )
+            else:
+                result = _EXPENSE_SERVICE.create_expense(
+                    group_id=group_id,
+                    amount=serializer.validated_data['amount'],
+                    paid_by_id=str(serializer.validated_data['paid_by']),
+                    description=serializer.validated_data.get('description')
+                )
 
-            response_serializer = ExpenseSerializer(expense)
+            response_serializer = ExpenseSerializer(result, many=many)
             return Response(
                 response_serializer.data,
                 status=status.HTTP_201_CREATED
@@ -676,11 +688,6 @@ class ExpenseBalanceView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.expense_service = ExpenseService()
-        self.group_service = GroupService()
-
     def get(self, request, group_id):
         """
         Get balance summary for a group.
@@ -692,14 +699,16 @@ class ExpenseBalanceView(APIView):
         """
         try:
             # Check if user is a member of the group
-            group = self.group_service.get_group(group_id)
-            if request.user not in group.members.all():
+            group = _GROUP_SERVICE.get_group(
+                group_id, user=request.user, fields=_MEMBERSHIP_CHECK_FIELDS
+            )
+            if not _is_member(group, request.user):
                 return Response(
                     {'error': 'You must be a member of the group to view balance summary.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            summary = self.expense_service.calculate_balance_summary(group_id)
+            summary = _EXPENSE_SERVICE.calculate_balance_summary(group_id)
             serializer = BalanceSummarySerializer(summary, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except GroupNotFoundError as e: